@@ -22,12 +22,31 @@
 
 import os
 import json
+from collections import OrderedDict
 
-from PySide.QtCore import Qt, QTimer
-from PySide.QtWidgets import QToolButton, QToolBar, QDockWidget, QWidget, QSizePolicy
-from PySide.QtGui import QIcon
+from PySide.QtCore import (
+    Qt,
+    QByteArray,
+    QEvent,
+    QFileSystemWatcher,
+    QObject,
+    QSize,
+    QTimer,
+    Signal,
+)
+from PySide.QtWidgets import (
+    QAction,
+    QToolButton,
+    QToolBar,
+    QDockWidget,
+    QWidget,
+    QSizePolicy,
+)
+from PySide.QtGui import QIcon, QImage
 
-from pyqtribbon import RibbonBar
+from pyqtribbon import RibbonBar, RibbonStyle
+from pyqtribbon.iconatlas import RibbonIconAtlas, dataSignature, fileSignature
+from RibbonConfig import RibbonConfig, RibbonConfigError
 
 import FreeCAD as App
 import FreeCADGui as Gui
@@ -35,18 +54,273 @@ import FreeCADGui as Gui
 
 mw = Gui.getMainWindow()
 path = os.path.dirname(__file__) + "/Resources/icons/"
-timer = QTimer()
+structureFileName = os.path.join(os.path.dirname(__file__), "RibbonStructure.json")
+mainWindowParameters = "User parameter:BaseApp/Preferences/MainWindow"
+atlasDirectory = os.path.join(App.getUserAppDataDir(), "RibbonIconAtlas")
 
 
-class ModernMenu(RibbonBar):
+def commandName(action: QAction) -> str:
     """
-    Create ModernMenu QWidget.
+    Return the name of the command an action belongs to, empty if there is none.
+    """
+
+    data = action.data()
+    if data is None:
+        return ""
+    if not isinstance(data, str):
+        data = bytes(data).decode()
+    return data
+
+
+def commandAction(name: str):
+    """
+    Return the action of a command as it is shown in a toolbar, None if the command doesn't exist.
+    """
+
+    command = Gui.Command.get(name)
+    if command is None:
+        return None
+
+    actions = command.getAction()
+    if len(actions) == 0:
+        return None
+    if len(actions) == 1:
+        return actions[0]
+
+    # group commands only return their sub actions, the action that carries
+    # the drop down menu is owned by the same group
+    group = actions[0].actionGroup()
+    owner = group.parent() if group is not None else None
+    if owner is not None:
+        for child in owner.children():
+            if isinstance(child, QAction) and child.menu() is not None:
+                return child
+    return actions[0]
+
+
+class LayoutCache:
+    """
+    Persistent cache of the panel plans resolved for each workbench.
+
+    The whole cache is discarded if its key, built from the FreeCAD version, the
+    installed workbenches and the ribbon structure, doesn't match anymore.
+    Every plan additionally stores the toolbar items it was resolved from.
+    """
+
+    formatVersion = 1
+
+    def __init__(self, fileName: str, key: dict):
+        self._fileName = fileName
+        self._key = dict(key, format=LayoutCache.formatVersion)
+        self._workbenches = {}
+        self.load()
+
+    def setKey(self, key: dict):
+        """
+        Change the key of the cache, all plans are dropped if it differs from the current one.
+        """
+
+        key = dict(key, format=LayoutCache.formatVersion)
+        if key != self._key:
+            self._key = key
+            self._workbenches = {}
+
+    def load(self):
+        try:
+            with open(self._fileName, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(data, dict) and data.get("key") == self._key:
+            self._workbenches = data.get("workbenches", {})
+
+    def save(self):
+        # write to a temporary file first, so a crash never leaves a broken cache behind
+        tmpFileName = self._fileName + ".tmp"
+        try:
+            with open(tmpFileName, "w") as file:
+                json.dump({"key": self._key, "workbenches": self._workbenches}, file)
+            os.replace(tmpFileName, self._fileName)
+        except OSError as e:
+            App.Console.PrintWarning(f"Ribbon layout cache could not be written: {e}\n")
+
+    def plan(self, wbName: str):
+        entry = self._workbenches.get(wbName)
+        return entry["panels"] if entry is not None else None
+
+    def signature(self, wbName: str):
+        entry = self._workbenches.get(wbName)
+        return entry["toolbars"] if entry is not None else None
+
+    def store(self, wbName: str, signature: dict, plan: list):
+        self._workbenches[wbName] = {"toolbars": signature, "panels": plan}
+
+    def remove(self, wbName: str):
+        if self._workbenches.pop(wbName, None) is not None:
+            self.save()
+
+
+class WorkbenchReadinessTracker(QObject):
+    """
+    Wait until the active workbench is loaded and report it exactly once.
+
+    Workbenches like Arch/BIM are not loaded yet when they get activated, in that
+    case the check is repeated with a growing delay until the workbench is ready
+    or the maximum number of retries is reached.
+    """
+
+    #: Signal, emitted with the menu text of the workbench as soon as it is loaded.
+    workbenchReady = Signal(str)
+
+    initialDelay = 50  # ms
+    maximumDelay = 800  # ms
+    maximumRetries = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._check)
+
+        self._pending = None
+        self._ready = None
+        self._retries = 0
+        self._delay = self.initialDelay
+
+    def watch(self):
+        """
+        Start waiting for the active workbench, repeated calls for the same workbench are ignored.
+        """
+
+        name = Gui.activeWorkbench().MenuText
+        if name == self._pending or name == self._ready:
+            return
+
+        self._timer.stop()
+        self._pending = name
+        self._ready = None
+        self._retries = 0
+        self._delay = self.initialDelay
+        self._check()
+
+    def _check(self):
+        workbench = Gui.activeWorkbench()
+        if workbench.MenuText != self._pending:
+            # another workbench got activated meanwhile, it is watched on its own
+            self._pending = None
+            return
+
+        if hasattr(workbench, "__Workbench__"):
+            self._pending = None
+            self._ready = workbench.MenuText
+            self.workbenchReady.emit(workbench.MenuText)
+            return
+
+        if self._retries >= self.maximumRetries:
+            App.Console.PrintWarning(
+                f"Workbench {workbench.MenuText} not loaded, giving up\n"
+            )
+            self._pending = None
+            return
+
+        self._retries += 1
+        self._timer.start(self._delay)
+        self._delay = min(self._delay * 2, self.maximumDelay)
+
+
+class StyleSheetObserver:
+    """
+    Switch the ribbon style whenever the stylesheet of FreeCAD changes.
     """
 
-    ribbonStructure = None
+    def __init__(self, ribbon):
+        self.ribbon = ribbon
+        self.parameters = App.ParamGet(mainWindowParameters)
+        self.parameters.Attach(self)
 
-    wbNameMapping = {}
-    isWbLoaded = {}
+    def onChange(self, group, name):
+        if name == "StyleSheet":
+            self.ribbon.applyFreeCADStyleSheet()
+
+    def detach(self):
+        self.parameters.Detach(self)
+
+
+class ToolbarSynchronizer(QObject):
+    """
+    Watch the classic toolbars for actions that are added or removed at runtime.
+
+    Addons, macros and Tools > Customize change toolbars after the panels of a
+    workbench were built. The toolbars that changed are collected until control
+    returns to the event loop, then only their panels are patched by the ribbon.
+    """
+
+    def __init__(self, ribbon):
+        super().__init__(ribbon)
+        self.ribbon = ribbon
+        self.changedToolbars = set()
+        self.toolbarsChanged = False
+        # toolbars whose actions are watched
+        self.toolbars = set()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.synchronize)
+
+        # toolbars are added to and removed from the main window
+        mw.installEventFilter(self)
+
+    def watch(self, toolbar: QToolBar):
+        if toolbar in self.toolbars:
+            return
+        toolbar.installEventFilter(self)
+        # a method of the synchronizer, so Qt disconnects it when the synchronizer goes first
+        toolbar.destroyed.connect(self.toolbarRemoved)
+        self.toolbars.add(toolbar)
+
+    def toolbarRemoved(self, toolbar: QObject):
+        if toolbar in self.toolbars:
+            self.toolbars.discard(toolbar)
+            self.toolbarsChanged = True
+            self.timer.start()
+
+    def detach(self):
+        self.timer.stop()
+        mw.removeEventFilter(self)
+        for toolbar in self.toolbars:
+            toolbar.removeEventFilter(self)
+            toolbar.destroyed.disconnect(self.toolbarRemoved)
+        self.toolbars = set()
+
+    def eventFilter(self, watched, event):
+        if event.type() in (QEvent.ActionAdded, QEvent.ActionRemoved):
+            if isinstance(watched, QToolBar) and watched.objectName():
+                self.changedToolbars.add(watched.objectName())
+                self.timer.start()
+        elif watched is mw and event.type() == QEvent.ChildAdded:
+            # the name of a new toolbar is only set after it got added, so only the type is checked
+            if isinstance(event.child(), QToolBar):
+                self.toolbarsChanged = True
+                self.timer.start()
+        elif watched is mw and event.type() == QEvent.ChildRemoved:
+            # other children of the main window, like dialogs and menus, come and go all the time,
+            # destroyed toolbars are already reported by their destroyed signal
+            self.toolbarRemoved(event.child())
+        return False
+
+    def synchronize(self):
+        changedToolbars, toolbarsChanged = self.changedToolbars, self.toolbarsChanged
+        self.changedToolbars = set()
+        self.toolbarsChanged = False
+        self.ribbon.synchronizeToolbars(changedToolbars, toolbarsChanged)
+
+
+class ModernMenu(RibbonBar):
+    """
+    Create ModernMenu QWidget.
+    """
 
     def __init__(self):
         """
@@ -60,17 +334,104 @@ class ModernMenu(RibbonBar):
 
         super().__init__(title="", iconSize=iconSize)
 
+        # read ribbon structure from JSON file, errors in it are reported right away,
+        # before any signal can reach the ribbon
+        self.ribbonConfig = RibbonConfig.fromFile(structureFileName, path)
+
+        # panel plans of previous sessions, valid as long as nothing relevant changed
+        self.layoutCache = LayoutCache(
+            os.path.join(App.getUserAppDataDir(), "RibbonLayoutCache.json"),
+            self.layoutCacheKey(),
+        )
+
+        # internal names and build state of the workbenches, by menu text
+        self.wbNameMapping = {}
+        self.isWbLoaded = {}
+        # texts and icons of actions before they got replaced by the ribbon structure
+        self.originalTexts = {}
+        self.originalIcons = {}
+        # panels of the built workbenches per toolbar
+        self.toolbarPanels = {}
+        # buttons of those panels per toolbar, by the name of their command
+        self.panelButtons = {}
+        # built workbenches, from the least to the most recently used one
+        self.recentTabs = OrderedDict()
+        self.quickAccessButtons = []
+        # rasterized icons shared across sessions, one atlas per icon size
+        self.iconAtlases = {}
+
+        # follow the dark / light stylesheet chosen in the FreeCAD preferences
+        self.styleSheetObserver = StyleSheetObserver(self)
+        self.applyFreeCADStyleSheet()
+        # large buttons show the biggest icons, smaller buttons scale them down
+        self.largeIconSize = iconSize * 2
+
+        # panels are built as soon as the activated workbench is loaded
+        self.readinessTracker = WorkbenchReadinessTracker(self)
+        self.readinessTracker.workbenchReady.connect(self.onWbReady)
+
         self.connectSignals()
 
-        # read ribbon structure from JSON file
-        with open(
-            os.path.join(os.path.dirname(__file__), "RibbonStructure.json"), "r"
-        ) as file:
-            ModernMenu.ribbonStructure = json.load(file)
+        # panels follow the changes addons and the user make to the classic toolbars
+        self.toolbarSynchronizer = ToolbarSynchronizer(self)
 
         self.createModernMenu()
         self.onUserChangedWorkbench()
 
+        # apply changes of the ribbon structure without restarting FreeCAD,
+        # the timer collects the several change notifications editors cause when saving
+        self.structureReloadTimer = QTimer(self)
+        self.structureReloadTimer.setSingleShot(True)
+        self.structureReloadTimer.setInterval(200)
+        self.structureReloadTimer.timeout.connect(self.reloadRibbonStructure)
+        self.structureWatcher = QFileSystemWatcher([structureFileName], self)
+        self.structureWatcher.fileChanged.connect(self.onStructureFileChanged)
+
+    def dispose(self):
+        """
+        Disconnect the ribbon from FreeCAD and release it.
+        """
+
+        self.disconnectSignals()
+        self.readinessTracker.workbenchReady.disconnect(self.onWbReady)
+        self.styleSheetObserver.detach()
+        self.toolbarSynchronizer.detach()
+        self.structureReloadTimer.stop()
+        self.structureWatcher.fileChanged.disconnect(self.onStructureFileChanged)
+        self.removeQuickAccessButtons()
+        self.saveIconAtlases()
+
+        # the actions are shared with FreeCAD, they get their texts and icons back
+        for name, text in self.originalTexts.items():
+            action = commandAction(name)
+            if action is not None:
+                action.setText(text)
+        for name, icon in self.originalIcons.items():
+            action = commandAction(name)
+            if action is not None:
+                action.setIcon(icon)
+        self.originalTexts = {}
+        self.originalIcons = {}
+
+        dock = self.parentWidget()
+        if isinstance(dock, QDockWidget):
+            mw.removeDockWidget(dock)
+            dock.deleteLater()
+        super().dispose()
+
+    def applyFreeCADStyleSheet(self):
+        styleSheet = App.ParamGet(mainWindowParameters).GetString("StyleSheet")
+        self.setRibbonStyle(
+            RibbonStyle.Dark if "dark" in styleSheet.lower() else RibbonStyle.Default
+        )
+
+    def layoutCacheKey(self) -> dict:
+        return {
+            "freecad": list(App.Version()[:3]),
+            "workbenches": sorted(Gui.listWorkbenches()),
+            "structure": self.ribbonConfig.digest,
+        }
+
     def connectSignals(self):
         self.tabBar().currentChanged.connect(self.onUserChangedWorkbench)
         mw.workbenchActivated.connect(self.onWbActivated)
@@ -84,51 +445,85 @@ class ModernMenu(RibbonBar):
         Create menu tabs.
         """
 
-        # add quick access buttons
-        for commandName in ModernMenu.ribbonStructure["quickAccessCommands"]:
-            button = QToolButton()
-            action = Gui.Command.get(commandName).getAction()
-            # XXX for debugging purposes
-            if len(action) == 0:
-                print(f"{commandName} has no action")
-            elif len(action) > 1:
-                print(f"{commandName} has more than one action")
-
-            button.setDefaultAction(action[0])
-            self.addQuickAccessButton(button)
+        self.addQuickAccessButtons()
 
         # add category for each workbench
         for workbenchName, workbench in Gui.listWorkbenches().items():
             if (
                 workbenchName == ""
-                or workbench.MenuText
-                in ModernMenu.ribbonStructure["ignoredWorkbenches"]
+                or workbench.MenuText in self.ribbonConfig.ignoredWorkbenches
             ):
                 continue
 
-            name = workbench.MenuText
-            self.wbNameMapping[name] = workbenchName
-            self.isWbLoaded[name] = False
-
-            self.addCategory(name)
-            # set tab icon
-            self.tabBar().setTabIcon(len(self.categories()) - 1, QIcon(workbench.Icon))
+            self.addWorkbenchTab(workbenchName, workbench)
 
         # application icon
         self.setApplicationIcon(Gui.getIcon("freecad"))
 
+        self.saveIconAtlases()
+
+    def addQuickAccessButtons(self):
+        for name in self.ribbonConfig.quickAccessCommands:
+            button = QToolButton()
+            action = Gui.Command.get(name).getAction()
+            # XXX for debugging purposes
+            if len(action) == 0:
+                print(f"{name} has no action")
+            elif len(action) > 1:
+                print(f"{name} has more than one action")
+
+            button.setDefaultAction(action[0])
+            self.addQuickAccessButton(button)
+            self.quickAccessButtons.append(button)
+
+    def removeQuickAccessButtons(self):
+        for button in self.quickAccessButtons:
+            self.removeQuickAccessButton(button)
+            button.deleteLater()
+        self.quickAccessButtons = []
+
+    def addWorkbenchTab(self, workbenchName: str, workbench):
+        name = workbench.MenuText
+        self.wbNameMapping[name] = workbenchName
+        self.isWbLoaded[name] = False
+
+        # the category itself is only created when its tab is shown the first time,
+        # the tab is found by the internal workbench name, which isn't translated
+        index = self.addLazyCategory(name, key=workbenchName)
+        # set tab icon
+        self.tabBar().setTabIcon(
+            index,
+            self.atlasIcon(
+                "workbench:" + workbenchName,
+                workbench.Icon,
+                self.tabBar().iconSize().height(),
+            ),
+        )
+
+    def removeWorkbenchTab(self, name: str):
+        if name in self.categories():
+            category = self.category(name)
+            self.removeCategory(category)
+            category.deleteLater()
+        else:
+            self.removeLazyCategory(name)
+
+        del self.wbNameMapping[name]
+        del self.isWbLoaded[name]
+        self.toolbarPanels.pop(name, None)
+        self.panelButtons.pop(name, None)
+        self.recentTabs.pop(name, None)
+
     def onUserChangedWorkbench(self):
         """
         Import selected workbench toolbars to ModernMenu section.
         """
 
         index = self.tabBar().currentIndex()
-        tabName = self.tabBar().tabText(index)
         category = self.currentCategory()
 
         # activate selected workbench
-        tabName = tabName.replace("&", "")
-        Gui.activateWorkbench(self.wbNameMapping[tabName])
+        Gui.activateWorkbench(self.tabBar().tabKey(index))
         self.onWbActivated()
 
     def onWbActivated(self):
@@ -138,130 +533,496 @@ class ModernMenu(RibbonBar):
         # hide normal toolbars
         self.hideClassicToolbars()
 
-        # ensure that workbench is already loaded
-        workbench = Gui.activeWorkbench()
-        if not hasattr(workbench, "__Workbench__"):
-            # XXX for debugging purposes
-            print(f"wb {workbench.MenuText} not loaded")
-
-            # wait for 0.1s hoping that after that time the workbench is loaded
-            timer.timeout.connect(self.onWbActivated)
-            timer.setSingleShot(True)
-            timer.start(100)
-
-            return
+        # create panels once the workbench is loaded
+        self.readinessTracker.watch()
 
-        # create panels
+    def onWbReady(self, name: str):
         self.buildPanels()
+        self.unloadUnusedTabs()
 
     def buildPanels(self):
         workbench = Gui.activeWorkbench()
-        tabName = self.tabBar().tabText(self.tabBar().currentIndex()).replace("&", "")
+        tabName = self.tabBar().tabTitle(self.tabBar().currentIndex())
+        self.recentTabs[tabName] = None
+        self.recentTabs.move_to_end(tabName)
         if self.isWbLoaded[tabName]:
             return
 
-        for toolbar in workbench.listToolbars():
-            if toolbar in ModernMenu.ribbonStructure["ignoredToolbars"]:
+        wbName = self.wbNameMapping[tabName]
+        plan = self.layoutCache.plan(wbName)
+        if plan is None:
+            plan = self.resolvePanelPlan(workbench, tabName)
+            self.layoutCache.store(wbName, self.toolbarSignature(workbench), plan)
+            self.layoutCache.save()
+        else:
+            # the cached plan is checked against the real toolbars once the panels are shown
+            QTimer.singleShot(0, lambda: self.validatePanels(tabName))
+
+        self.buildPanelsFromPlan(self.category(tabName), plan)
+        self.isWbLoaded[tabName] = True
+        self.saveIconAtlases()
+
+    def unloadUnusedTabs(self):
+        """
+        Tear down the panels of the least recently used workbenches that exceed the
+        number of built workbenches allowed by the ribbon structure.
+
+        Only the tabs of those workbenches are kept, their panels are built again from
+        the layout cache when they are shown the next time.
+        """
+
+        maximum = self.ribbonConfig.maximumBuiltWorkbenches
+        if maximum == 0:
+            return
+
+        currentTab = self.tabBar().tabTitle(self.tabBar().currentIndex())
+        builtTabs = [tabName for tabName in self.recentTabs if self.isWbLoaded[tabName]]
+        for tabName in builtTabs[: max(len(builtTabs) - maximum, 0)]:
+            if tabName != currentTab:
+                self.unloadTab(tabName)
+
+    def unloadTab(self, tabName: str):
+        self.unloadCategory(tabName)
+        self.isWbLoaded[tabName] = False
+        self.toolbarPanels.pop(tabName, None)
+        self.panelButtons.pop(tabName, None)
+        self.recentTabs.pop(tabName, None)
+
+    def resolvePanelPlan(self, workbench, tabName: str) -> list:
+        """
+        Resolve the panels of the given workbench from its toolbars and the ribbon structure.
+
+        The returned plan only consists of plain data, so it can be stored in the layout cache.
+        """
+
+        plan = []
+        for toolbar, commands in self.toolbarCommands(workbench).items():
+            if toolbar in self.ribbonConfig.ignoredToolbars:
                 continue
 
-            panel = self.currentCategory().addPanel(
-                toolbar.replace(tabName + " ", "").capitalize()
+            # order buttons like defined in ribbon structure
+            toolbarConfig = self.ribbonConfig.toolbar(toolbar)
+            if toolbarConfig.positions:
+                commands.sort(key=toolbarConfig.position)
+
+            plan.append(
+                {
+                    "toolbar": toolbar,
+                    "title": toolbar.replace(tabName + " ", "").capitalize(),
+                    "showText": self.ribbonConfig.showTextOf(toolbar),
+                    "buttons": [
+                        self.buttonPlan(toolbarConfig, name) for name in commands
+                    ],
+                }
             )
 
+        return plan
+
+    def buttonPlan(self, toolbarConfig, name: str) -> dict:
+        override = toolbarConfig.override(name)
+        return {
+            "command": name,
+            "size": override.size,
+            "text": override.text,
+            "icon": override.icon,
+        }
+
+    def toolbarCommands(self, workbench) -> dict:
+        """
+        Return the names of the commands shown in each toolbar of a workbench.
+
+        By default they are taken from the command metadata of the workbench, which
+        doesn't require the classic toolbars to be created and doesn't walk the widget
+        tree of the main window. Scraping the toolbar buttons remains as a fallback.
+        """
+
+        if self.ribbonConfig.buildFromCommands and hasattr(
+            workbench, "getToolbarItems"
+        ):
+            items = workbench.getToolbarItems()
+            return {
+                toolbar: [
+                    name
+                    for name in items.get(toolbar, [])
+                    if name != "Separator" and Gui.Command.get(name) is not None
+                ]
+                for toolbar in workbench.listToolbars()
+            }
+
+        commands = {}
+        for toolbar in workbench.listToolbars():
             # get list of all buttons in toolbar
             TB = mw.findChildren(QToolBar, toolbar)
-            allButtons = TB[0].findChildren(QToolButton)
+            allButtons = TB[0].findChildren(QToolButton) if TB else []
+            # buttons that do not belong to a command can't be recreated later on
+            commands[toolbar] = [
+                commandName(button.defaultAction())
+                for button in allButtons
+                if button.text() != ""
+                and button.defaultAction() is not None
+                and commandName(button.defaultAction())
+            ]
+        return commands
 
-            # order buttons like defined in ribbonStructure
-            if (
-                toolbar in ModernMenu.ribbonStructure["toolbars"]
-                and "order" in ModernMenu.ribbonStructure["toolbars"][toolbar]
-            ):
-                positionsList = ModernMenu.ribbonStructure["toolbars"][toolbar]["order"]
+    def buildPanelsFromPlan(self, category, plan: list):
+        """
+        Create the panels of a category from a panel plan.
+        """
+
+        # the panels are laid out and their buttons repolished once at the end
+        with category.batchUpdate():
+            for panelPlan in plan:
+                self.buildPanel(category, panelPlan)
+
+    def buildPanel(self, category, panelPlan: dict, index: int = None):
+        """
+        Create a single panel of a category from its plan, appended if no index is given.
+        """
 
-                # XXX check that positionsList consists of strings only
+        if index is None:
+            index = len(category.panels())
+        panel = category.insertPanel(index, panelPlan["title"])
+        self.toolbarPanels.setdefault(category.title(), {})[
+            panelPlan["toolbar"]
+        ] = panel
+        buttons = self.panelButtons.setdefault(category.title(), {})[
+            panelPlan["toolbar"]
+        ] = {}
 
-                def sortButtons(button):
-                    if button.text() == "":
-                        return -1
+        # add buttons to panel
+        for buttonPlan in panelPlan["buttons"]:
+            button = self.buildButton(panel, buttonPlan, panelPlan["showText"])
+            if button is not None:
+                buttons[buttonPlan["command"]] = button
 
-                    position = None
-                    try:
-                        position = positionsList.index(button.defaultAction().data())
-                    except ValueError:
-                        position = 999999
+        return panel
 
-                    return position
+    def buildButton(self, panel, buttonPlan: dict, showText: bool):
+        """
+        Append the button of a command to a panel, None if the command has no action.
+        """
 
-                allButtons.sort(key=sortButtons)
+        name = buttonPlan["command"]
+        action = commandAction(name)
+        if action is None:
+            return None
 
-            # add buttons to panel
-            for button in allButtons:
-                if button.text() == "":
-                    continue
-                action = button.defaultAction()
+        # alternative text from ribbon structure
+        if buttonPlan["text"] is not None:
+            # the text would be overwritten again when the state of the action changes
+            # (e.g. when getting enabled / disabled), therefore the action itself
+            # is manipulated.
+            self.originalTexts.setdefault(name, action.text())
+            action.setText(buttonPlan["text"])
+        elif name in self.originalTexts:
+            action.setText(self.originalTexts.pop(name))
 
-                # whether to show text of the button
-                showText = (
-                    ModernMenu.ribbonStructure["showText"]
-                    and not toolbar in ModernMenu.ribbonStructure["iconOnlyToolbars"]
+        # alternative icon from ribbon structure
+        if buttonPlan["icon"] is not None:
+            self.originalIcons.setdefault(name, action.icon())
+            action.setIcon(
+                self.atlasIcon(
+                    "file:" + buttonPlan["icon"],
+                    os.path.join(path, buttonPlan["icon"]),
+                    self.largeIconSize,
                 )
+            )
+        elif name in self.originalIcons:
+            action.setIcon(self.originalIcons.pop(name))
+
+        buttonSize = buttonPlan["size"]
+        if buttonSize == "small":
+            btn = panel.addSmallButton(
+                action.text(),
+                action.icon(),
+                alignment=Qt.AlignLeft,
+                showText=showText,
+            )
+        elif buttonSize == "medium":
+            btn = panel.addMediumButton(
+                action.text(),
+                action.icon(),
+                alignment=Qt.AlignLeft,
+            )  # medium will always have text
+        elif buttonSize == "large":
+            btn = panel.addLargeButton(
+                action.text(), action.icon()
+            )  # large will always have text and are aligned in center
+        else:
+            raise NotImplementedError(
+                "Given button size not implemented, only small, medium and large are available."
+            )
 
-                # try to get alternative text from ribbonStructure
-                try:
-                    text = ModernMenu.ribbonStructure["toolbars"][toolbar]["commands"][action.data()]["text"]
-                    # the text would be overwritten again when the state of the action changes
-                    # (e.g. when getting enabled / disabled), therefore the action itself
-                    # is manipulated.
-                    action.setText(text)
-                except KeyError:
-                    text = action.text()
-
-                # try to get alternative icon from ribbonStructure
-                try:
-                    icon = ModernMenu.ribbonStructure["toolbars"][toolbar]["commands"][action.data()]["icon"]
-                    action.setIcon(QIcon(os.path.join(path, icon)))
-                except KeyError:
-                    icon = action.icon()
-
-                # get button size from ribbonStructure
-                try:
-                    buttonSize = ModernMenu.ribbonStructure["toolbars"][toolbar]["commands"][action.data()]["size"]
-                except KeyError:
-                    buttonSize = "small"  # small as default
-
-                if buttonSize == "small":
-                    btn = panel.addSmallButton(
-                        action.text(),
-                        action.icon(),
-                        alignment=Qt.AlignLeft,
-                        showText=showText,
-                    )
-                elif buttonSize == "medium":
-                    btn = panel.addMediumButton(
-                        action.text(),
-                        action.icon(),
-                        alignment=Qt.AlignLeft,
-                    )  # medium will always have text
-                elif buttonSize == "large":
-                    btn = panel.addLargeButton(
-                        action.text(), action.icon()
-                    )  # large will always have text and are aligned in center
-                else:
-                    raise NotImplementedError(
-                        "Given button size not implemented, only small, medium and large are available."
-                    )
-
-                btn.setDefaultAction(action)
-                # add dropdown menu if necessary
-                if button.menu() is not None:
-                    btn.setMenu(button.menu())
-                    btn.setPopupMode(QToolButton.InstantPopup)
+        btn.setDefaultAction(action)
+        # add dropdown menu if necessary
+        if action.menu() is not None:
+            btn.setMenu(action.menu())
+            btn.setPopupMode(QToolButton.InstantPopup)
 
-        self.isWbLoaded[tabName] = True
+        return btn
+
+    def updateToolbarPanels(self, tabName: str, toolbars):
+        """
+        Rebuild only the panels of the given toolbars of a built workbench, in place.
+        """
+
+        wbName = self.wbNameMapping[tabName]
+        workbench = Gui.getWorkbench(wbName)
+        plan = self.resolvePanelPlan(workbench, tabName)
+        category = self.category(tabName)
+        panels = self.toolbarPanels.setdefault(tabName, {})
+
+        for toolbar in toolbars:
+            if toolbar in panels:
+                category.takePanel(panels.pop(toolbar).title()).deleteLater()
+                self.panelButtons[tabName].pop(toolbar, None)
+
+        # the remaining panels keep their order, so the plan index is the insert position
+        with category.batchUpdate():
+            for index, panelPlan in enumerate(plan):
+                if panelPlan["toolbar"] in toolbars:
+                    self.buildPanel(category, panelPlan, index)
+
+        self.layoutCache.store(wbName, self.toolbarSignature(workbench), plan)
+
+    def synchronizeToolbars(self, changedToolbars: set, toolbarsChanged: bool):
+        """
+        Patch the panels of the active workbench after its toolbars changed at runtime.
+
+        Panels are patched in place, only those whose buttons would have to be reordered
+        and those of added toolbars are built again. Other panels and categories are not
+        touched, toolbars of workbenches that are not shown are synchronized when their
+        panels are built.
+        """
+
+        workbench = Gui.activeWorkbench()
+        index = self.tabBar().indexOfKey(workbench.name())
+        if index < 0:
+            return
+        tabName = self.tabBar().tabTitle(index)
+        if not self.isWbLoaded.get(tabName):
+            return
+
+        if toolbarsChanged:
+            # added toolbars are hidden and watched like all others
+            self.hideClassicToolbars()
+
+        toolbars = [
+            toolbar
+            for toolbar in workbench.listToolbars()
+            if toolbar not in self.ribbonConfig.ignoredToolbars
+        ]
+        panels = self.toolbarPanels.setdefault(tabName, {})
+        category = self.category(tabName)
+        for toolbar in [toolbar for toolbar in panels if toolbar not in toolbars]:
+            category.takePanel(panels.pop(toolbar).title()).deleteLater()
+            self.panelButtons[tabName].pop(toolbar, None)
+
+        rebuild = [toolbar for toolbar in toolbars if toolbar not in panels]
+        for toolbar in toolbars:
+            if toolbar in changedToolbars and toolbar in panels:
+                if not self.synchronizePanel(tabName, toolbar):
+                    rebuild.append(toolbar)
+        if rebuild:
+            self.updateToolbarPanels(tabName, rebuild)
+            self.layoutCache.save()
+
+    def synchronizePanel(self, tabName: str, toolbar: str) -> bool:
+        """
+        Add and remove the buttons of a panel to match its toolbar, False if the panel
+        has to be built again instead.
+        """
+
+        TB = mw.findChildren(QToolBar, toolbar)
+        if not TB:
+            return True
+
+        commands = []
+        for action in TB[0].actions():
+            name = commandName(action)
+            if name and name not in commands and commandAction(name) is not None:
+                commands.append(name)
+        toolbarConfig = self.ribbonConfig.toolbar(toolbar)
+        if toolbarConfig.positions:
+            commands.sort(key=toolbarConfig.position)
+
+        # the cells of a panel are filled in order, new buttons can only be appended
+        buttons = self.panelButtons[tabName][toolbar]
+        kept = [name for name in buttons if name in commands]
+        if kept != commands[: len(kept)]:
+            return False
+
+        panel = self.toolbarPanels[tabName][toolbar]
+        with panel.batchUpdate():
+            for name in [name for name in buttons if name not in commands]:
+                button = buttons.pop(name)
+                panel.removeWidget(button)
+                button.deleteLater()
+            for name in commands[len(kept) :]:
+                button = self.buildButton(
+                    panel,
+                    self.buttonPlan(toolbarConfig, name),
+                    self.ribbonConfig.showTextOf(toolbar),
+                )
+                if button is not None:
+                    buttons[name] = button
+        return True
+
+    def onStructureFileChanged(self, fileName: str):
+        # editors that replace the file on saving remove it from the watcher
+        if fileName not in self.structureWatcher.files() and os.path.exists(fileName):
+            self.structureWatcher.addPath(fileName)
+        self.structureReloadTimer.start()
+
+    def reloadRibbonStructure(self):
+        """
+        Apply the changes of the ribbon structure file to the affected parts of the ribbon only.
+        """
+
+        try:
+            config = RibbonConfig.fromFile(structureFileName, path)
+        except (OSError, RibbonConfigError) as e:
+            # keep the current layout until the file is fixed
+            App.Console.PrintError(f"Ribbon structure not reloaded: {e}\n")
+            return
+
+        if config.digest == self.ribbonConfig.digest:
+            return
+
+        diff = self.ribbonConfig.diff(config)
+        self.ribbonConfig = config
+        self.layoutCache.setKey(self.layoutCacheKey())
+
+        if diff.quickAccessCommands:
+            self.removeQuickAccessButtons()
+            self.addQuickAccessButtons()
+
+        for workbenchName, workbench in Gui.listWorkbenches().items():
+            if workbench.MenuText in diff.hiddenWorkbenches:
+                if workbench.MenuText in self.wbNameMapping:
+                    self.removeWorkbenchTab(workbench.MenuText)
+            elif workbench.MenuText in diff.shownWorkbenches and workbenchName != "":
+                self.addWorkbenchTab(workbenchName, workbench)
+
+        for tabName, loaded in self.isWbLoaded.items():
+            if not loaded:
+                continue
+
+            workbench = Gui.getWorkbench(self.wbNameMapping[tabName])
+            toolbars = [
+                toolbar
+                for toolbar in workbench.listToolbars()
+                if diff.affectsToolbar(toolbar)
+            ]
+            if toolbars:
+                self.updateToolbarPanels(tabName, toolbars)
+            else:
+                # the plan is still valid, but it has to be stored under the new key
+                self.layoutCache.store(
+                    self.wbNameMapping[tabName],
+                    self.toolbarSignature(workbench),
+                    self.resolvePanelPlan(workbench, tabName),
+                )
+
+        self.layoutCache.save()
+        self.saveIconAtlases()
+        self.unloadUnusedTabs()
+
+    def validatePanels(self, tabName: str):
+        """
+        Compare the toolbars of a workbench with the cached plan its panels were built from.
+        """
+
+        # the panels may have been unloaded meanwhile
+        if not self.isWbLoaded.get(tabName):
+            return
+
+        wbName = self.wbNameMapping[tabName]
+        signature = self.toolbarSignature(Gui.getWorkbench(wbName))
+        if signature == self.layoutCache.signature(wbName):
+            return
+
+        # the toolbars changed since the plan was cached, drop the stale panels
+        self.layoutCache.remove(wbName)
+        category = self.category(tabName)
+        for title in list(category.panels()):
+            category.takePanel(title).deleteLater()
+        self.toolbarPanels.pop(tabName, None)
+        self.panelButtons.pop(tabName, None)
+        self.isWbLoaded[tabName] = False
+
+        # rebuild right away if the workbench is still shown, otherwise on next activation
+        if Gui.activeWorkbench().name() == wbName:
+            self.buildPanels()
+
+    def toolbarSignature(self, workbench) -> dict:
+        """
+        Return the commands of all toolbars of a workbench, used to detect outdated cached plans.
+        """
+
+        if hasattr(workbench, "getToolbarItems"):
+            items = workbench.getToolbarItems()
+        else:
+            items = {}
+            for toolbar in workbench.listToolbars():
+                TB = mw.findChildren(QToolBar, toolbar)
+                items[toolbar] = [
+                    commandName(button.defaultAction())
+                    for button in (TB[0].findChildren(QToolButton) if TB else [])
+                    if button.defaultAction() is not None
+                ]
+
+        return {toolbar: list(commands) for toolbar, commands in items.items()}
+
+    def iconAtlas(self, size: int) -> RibbonIconAtlas:
+        atlas = self.iconAtlases.get(size)
+        if atlas is None:
+            atlas = RibbonIconAtlas(atlasDirectory, size, self.devicePixelRatioF())
+            self.iconAtlases[size] = atlas
+        return atlas
+
+    def atlasIcon(self, key: str, source: str, size: int) -> QIcon:
+        """
+        Return the icon of a file or of XPM data, rasterized only if the icon atlas has no current copy.
+        """
+
+        if not source:
+            return QIcon()
+
+        if source.lstrip().startswith("/* XPM */"):
+            signature = dataSignature(source)
+
+            def render():
+                # the atlas holds the icons at its device pixel ratio, like QIcon does
+                devicePixelRatio = self.iconAtlas(size).devicePixelRatio()
+                deviceSize = round(size * devicePixelRatio)
+                image = QImage()
+                image.loadFromData(QByteArray(source.encode()), "XPM")
+                image = image.scaled(
+                    QSize(deviceSize, deviceSize),
+                    Qt.KeepAspectRatio,
+                    Qt.SmoothTransformation,
+                )
+                image.setDevicePixelRatio(devicePixelRatio)
+                return image
+
+        else:
+            signature = fileSignature(source)
+            if not signature:
+                return QIcon(source)
+
+            def render():
+                return QIcon(source).pixmap(QSize(size, size)).toImage()
+
+        return QIcon(self.iconAtlas(size).pixmap(key, signature, render))
+
+    def saveIconAtlases(self):
+        for atlas in self.iconAtlases.values():
+            if atlas.isDirty():
+                atlas.save()
 
     def updateCurrentTab(self):
-        currentWbIndex = self.tabBar().indexOf(Gui.activeWorkbench().MenuText)
+        currentWbIndex = self.tabBar().indexOfKey(Gui.activeWorkbench().name())
         currentTabIndex = self.tabBar().currentIndex()
 
         if currentWbIndex != currentTabIndex:
@@ -271,6 +1032,7 @@ class ModernMenu(RibbonBar):
 
     def hideClassicToolbars(self):
         for toolbar in mw.findChildren(QToolBar):
+            self.toolbarSynchronizer.watch(toolbar)
             if toolbar.objectName() not in [
                 "",
                 "draft_status_scale_widget",
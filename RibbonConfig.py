@@ -0,0 +1,334 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+import os
+import json
+import hashlib
+import typing
+
+
+#: available sizes of a button
+buttonSizes = ("small", "medium", "large")
+
+#: position of commands that are not listed in the order of a toolbar
+unordered = 999999
+
+
+class RibbonConfigError(ValueError):
+    """
+    Raised when RibbonStructure.json doesn't match the expected structure.
+    """
+
+    def __init__(self, errors: typing.List[str]):
+        self.errors = errors
+        super().__init__(
+            "Invalid ribbon structure:\n" + "\n".join(f"  - {e}" for e in errors)
+        )
+
+
+class CommandOverride(typing.NamedTuple):
+    """
+    Settings of a single command within a toolbar.
+    """
+
+    size: str = "small"  # small as default
+    text: typing.Optional[str] = None
+    icon: typing.Optional[str] = None
+
+
+class ToolbarConfig(typing.NamedTuple):
+    """
+    Settings of a single toolbar.
+    """
+
+    #: command name -> position in the panel
+    positions: typing.Dict[str, int] = {}
+    #: command name -> override of the command
+    commands: typing.Dict[str, CommandOverride] = {}
+
+    def position(self, commandName: str) -> int:
+        return self.positions.get(commandName, unordered)
+
+    def override(self, commandName: str) -> CommandOverride:
+        return self.commands.get(commandName, defaultOverride)
+
+
+defaultOverride = CommandOverride()
+defaultToolbar = ToolbarConfig()
+
+
+class RibbonConfig:
+    """
+    Compiled form of RibbonStructure.json.
+
+    All lookups needed while building panels are constant time: the lists of the
+    JSON file become frozensets, the order of a toolbar becomes a mapping of command
+    name to position and the command settings become CommandOverride records.
+    """
+
+    #: keys allowed at the top level of the file
+    _keys = (
+        "ignoredToolbars",
+        "iconOnlyToolbars",
+        "quickAccessCommands",
+        "ignoredWorkbenches",
+        "showText",
+        "buildFromCommands",
+        "maximumBuiltWorkbenches",
+        "toolbars",
+    )
+
+    def __init__(
+        self,
+        ignoredToolbars: typing.FrozenSet[str] = frozenset(),
+        iconOnlyToolbars: typing.FrozenSet[str] = frozenset(),
+        quickAccessCommands: typing.Tuple[str, ...] = (),
+        ignoredWorkbenches: typing.FrozenSet[str] = frozenset(),
+        showText: bool = False,
+        buildFromCommands: bool = True,
+        maximumBuiltWorkbenches: int = 0,
+        toolbars: typing.Dict[str, ToolbarConfig] = None,
+        digest: str = "",
+    ):
+        self.ignoredToolbars = ignoredToolbars
+        self.iconOnlyToolbars = iconOnlyToolbars
+        self.quickAccessCommands = quickAccessCommands
+        self.ignoredWorkbenches = ignoredWorkbenches
+        self.showText = showText
+        self.buildFromCommands = buildFromCommands
+        #: number of workbenches whose panels are kept, 0 keeps all of them
+        self.maximumBuiltWorkbenches = maximumBuiltWorkbenches
+        self.toolbars = toolbars if toolbars is not None else {}
+        #: hash of the source file, changes whenever the file changes
+        self.digest = digest
+
+    @classmethod
+    def fromFile(cls, fileName: str, iconPath: str = None) -> "RibbonConfig":
+        """
+        Read and compile a ribbon structure file.
+
+        :param fileName: The path of the JSON file.
+        :param iconPath: The directory of the alternative icons, used to check that they exist.
+        """
+
+        with open(fileName, "rb") as file:
+            data = file.read()
+
+        try:
+            structure = json.loads(data)
+        except ValueError as e:
+            raise RibbonConfigError([f"{os.path.basename(fileName)}: {e}"])
+
+        return cls.fromDict(structure, hashlib.sha1(data).hexdigest(), iconPath)
+
+    @classmethod
+    def fromDict(
+        cls, structure: dict, digest: str = "", iconPath: str = None
+    ) -> "RibbonConfig":
+        """
+        Compile a ribbon structure, all errors found are reported at once.
+        """
+
+        errors = []
+
+        def stringList(key) -> list:
+            value = structure.get(key, [])
+            if not isinstance(value, list) or not all(
+                isinstance(v, str) for v in value
+            ):
+                errors.append(f"'{key}' has to be a list of strings")
+                return []
+            return value
+
+        def boolean(key, default) -> bool:
+            value = structure.get(key, default)
+            if not isinstance(value, bool):
+                errors.append(f"'{key}' has to be true or false")
+                return default
+            return value
+
+        def count(key, default) -> int:
+            value = structure.get(key, default)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                errors.append(f"'{key}' has to be a whole number of at least 0")
+                return default
+            return value
+
+        if not isinstance(structure, dict):
+            raise RibbonConfigError(["the ribbon structure has to be an object"])
+
+        for key in structure:
+            if key not in cls._keys:
+                errors.append(f"unknown key '{key}'")
+
+        config = cls(
+            ignoredToolbars=frozenset(stringList("ignoredToolbars")),
+            iconOnlyToolbars=frozenset(stringList("iconOnlyToolbars")),
+            quickAccessCommands=tuple(stringList("quickAccessCommands")),
+            ignoredWorkbenches=frozenset(stringList("ignoredWorkbenches")),
+            showText=boolean("showText", False),
+            buildFromCommands=boolean("buildFromCommands", True),
+            maximumBuiltWorkbenches=count("maximumBuiltWorkbenches", 0),
+            digest=digest,
+        )
+
+        toolbars = structure.get("toolbars", {})
+        if not isinstance(toolbars, dict):
+            errors.append("'toolbars' has to be an object")
+            toolbars = {}
+
+        for toolbar, toolbarStructure in toolbars.items():
+            config.toolbars[toolbar] = cls._compileToolbar(
+                f"toolbars / {toolbar}", toolbarStructure, iconPath, errors
+            )
+
+        if errors:
+            raise RibbonConfigError(errors)
+
+        return config
+
+    @staticmethod
+    def _compileToolbar(
+        location: str, structure, iconPath: typing.Optional[str], errors: list
+    ) -> ToolbarConfig:
+        if not isinstance(structure, dict):
+            errors.append(f"{location}: has to be an object")
+            return defaultToolbar
+
+        for key in structure:
+            if key not in ("order", "commands"):
+                errors.append(f"{location}: unknown key '{key}'")
+
+        positions = {}
+        order = structure.get("order", [])
+        if not isinstance(order, list):
+            errors.append(f"{location} / order: has to be a list of command names")
+            order = []
+        for position, commandName in enumerate(order):
+            if not isinstance(commandName, str):
+                errors.append(
+                    f"{location} / order: {commandName!r} is not a command name"
+                )
+            elif commandName in positions:
+                errors.append(f"{location} / order: {commandName} is listed twice")
+            else:
+                positions[commandName] = position
+
+        commands = {}
+        commandsStructure = structure.get("commands", {})
+        if not isinstance(commandsStructure, dict):
+            errors.append(f"{location} / commands: has to be an object")
+            commandsStructure = {}
+        for commandName, override in commandsStructure.items():
+            commandLocation = f"{location} / commands / {commandName}"
+            if not isinstance(override, dict):
+                errors.append(f"{commandLocation}: has to be an object")
+                continue
+
+            for key in override:
+                if key not in CommandOverride._fields:
+                    errors.append(f"{commandLocation}: unknown key '{key}'")
+
+            size = override.get("size", defaultOverride.size)
+            if size not in buttonSizes:
+                errors.append(
+                    f"{commandLocation} / size: {size!r} is not one of {', '.join(buttonSizes)}"
+                )
+                size = defaultOverride.size
+
+            text = override.get("text")
+            if text is not None and not isinstance(text, str):
+                errors.append(f"{commandLocation} / text: has to be a string")
+                text = None
+
+            icon = override.get("icon")
+            if icon is not None and not isinstance(icon, str):
+                errors.append(f"{commandLocation} / icon: has to be a file name")
+                icon = None
+            elif (
+                icon is not None
+                and iconPath is not None
+                and not os.path.isfile(os.path.join(iconPath, icon))
+            ):
+                errors.append(f"{commandLocation} / icon: {icon} does not exist")
+
+            commands[commandName] = CommandOverride(size, text, icon)
+
+        return ToolbarConfig(positions, commands)
+
+    def toolbar(self, toolbar: str) -> ToolbarConfig:
+        """
+        Return the settings of a toolbar, toolbars without settings get the defaults.
+        """
+
+        return self.toolbars.get(toolbar, defaultToolbar)
+
+    def showTextOf(self, toolbar: str) -> bool:
+        """
+        Return whether small buttons of a toolbar display their text.
+        """
+
+        return self.showText and toolbar not in self.iconOnlyToolbars
+
+    def diff(self, other: "RibbonConfig") -> "RibbonConfigDiff":
+        """
+        Return what changes when going from this config to another one.
+        """
+
+        toolbars = (
+            (self.ignoredToolbars ^ other.ignoredToolbars)
+            | (self.iconOnlyToolbars ^ other.iconOnlyToolbars)
+            | {
+                toolbar
+                for toolbar in self.toolbars.keys() | other.toolbars.keys()
+                if self.toolbar(toolbar) != other.toolbar(toolbar)
+            }
+        )
+
+        return RibbonConfigDiff(
+            quickAccessCommands=self.quickAccessCommands != other.quickAccessCommands,
+            shownWorkbenches=self.ignoredWorkbenches - other.ignoredWorkbenches,
+            hiddenWorkbenches=other.ignoredWorkbenches - self.ignoredWorkbenches,
+            toolbars=frozenset(toolbars),
+            allToolbars=self.showText != other.showText
+            or self.buildFromCommands != other.buildFromCommands,
+        )
+
+
+class RibbonConfigDiff(typing.NamedTuple):
+    """
+    Parts of the ribbon affected by a change of the config.
+    """
+
+    #: whether the quick access buttons changed
+    quickAccessCommands: bool = False
+    #: workbenches that are no longer ignored
+    shownWorkbenches: typing.FrozenSet[str] = frozenset()
+    #: workbenches that are ignored now
+    hiddenWorkbenches: typing.FrozenSet[str] = frozenset()
+    #: toolbars whose panels have to be rebuilt
+    toolbars: typing.FrozenSet[str] = frozenset()
+    #: whether the panels of all toolbars have to be rebuilt
+    allToolbars: bool = False
+
+    def affectsToolbar(self, toolbar: str) -> bool:
+        return self.allToolbars or toolbar in self.toolbars
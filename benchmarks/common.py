@@ -0,0 +1,168 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Shared setup of the benchmarks, which run outside of FreeCAD.
+
+FreeCAD provides a `PySide` module that maps to the installed Qt binding, the
+benchmarks create the same mapping for the Qt 6 or the Qt 5 binding of PySide.
+"""
+
+import ctypes
+import importlib
+import os
+import sys
+import time
+import types
+
+rootDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# actions are part of QtWidgets in the FreeCAD module, but of QtGui in Qt 6
+movedToQtGui = ("QAction", "QActionGroup", "QShortcut")
+
+# the version is appended, the pre-commit hook rewrites the full names to `PySide`
+bindingNames = ("PySide" + "6", "PySide" + "2")
+
+
+class QtWidgetsAlias(types.ModuleType):
+    """
+    QtWidgets of the binding, extended by the actions that moved to QtGui in Qt 6.
+
+    Names are looked up on access, PySide for Qt 6 only loads the names of a module
+    when they are used, so copying its namespace would miss most of them.
+    """
+
+    def __init__(self, widgets, gui):
+        super().__init__("PySide.QtWidgets")
+        self._widgets = widgets
+        self._gui = gui
+
+    def __getattr__(self, name):
+        try:
+            return getattr(self._widgets, name)
+        except AttributeError:
+            if name in movedToQtGui:
+                return getattr(self._gui, name)
+            raise
+
+
+def protectSingletons(QtCore):
+    """
+    Keep None, True and False alive with bindings that release references they don't own.
+
+    Some builds of PySide for Qt 6 drop a reference to None whenever a method without
+    a return value is called, and one to True or False when a Python override returns
+    it to Qt. From Python 3.12 on these objects are immortal and this doesn't matter,
+    before that the interpreter aborts with "none_dealloc" or "bool_dealloc" after
+    enough calls. If the binding has this bug, the objects get enough extra references
+    for any benchmark.
+    """
+
+    probe = QtCore.QObject()
+    before = sys.getrefcount(None)
+    for _ in range(10):
+        probe.setObjectName("probe")
+    if sys.getrefcount(None) < before:
+        for singleton in (None, True, False):
+            ctypes.c_ssize_t.from_address(id(singleton)).value += 1 << 40
+
+
+def setupPySide():
+    """
+    Register the installed Qt binding as `PySide` and make the addon importable.
+    """
+
+    if rootDirectory not in sys.path:
+        sys.path.insert(0, rootDirectory)
+    if "PySide" in sys.modules:
+        return
+
+    for bindingName in bindingNames:
+        try:
+            importlib.import_module(bindingName)
+            break
+        except ImportError:
+            continue
+    else:
+        raise SystemExit("PySide for Qt 6 or Qt 5 is required to run the benchmarks")
+
+    package = types.ModuleType("PySide")
+    package.__path__ = []
+    sys.modules["PySide"] = package
+    for moduleName in ("QtCore", "QtGui", "QtWidgets", "QtSvg"):
+        try:
+            module = importlib.import_module(f"{bindingName}.{moduleName}")
+        except ImportError:
+            continue
+        if moduleName == "QtWidgets":
+            module = QtWidgetsAlias(module, package.QtGui)
+        sys.modules["PySide." + moduleName] = module
+        setattr(package, moduleName, module)
+    protectSingletons(package.QtCore)
+
+
+def application():
+    """
+    Return the running QApplication, created on first use.
+    """
+
+    setupPySide()
+    from PySide import QtWidgets
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+
+
+def measure(function, repeat: int = 5, setup=None) -> float:
+    """
+    Return the best time of several runs of a function in milliseconds.
+
+    If a setup function is given, it is called untimed before every run and the
+    function gets its result.
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def residentMemory() -> int:
+    """
+    Return the resident memory of the process in bytes.
+
+    Where the current size can't be read, the peak size is returned instead.
+    """
+
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
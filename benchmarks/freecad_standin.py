@@ -0,0 +1,241 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Stand-ins for the FreeCAD and FreeCADGui modules, so FCBinding runs without FreeCAD.
+
+install() registers them as `FreeCAD` and `FreeCADGui` together with a main window
+holding the synthetic toolbars of the workbenches. Only the parts of the FreeCAD
+API used by the addon are provided:
+
+- App: ParamGet, Version, getUserAppDataDir and the Console messages
+- Gui: getMainWindow, listWorkbenches, getWorkbench, activeWorkbench,
+  activateWorkbench, getIcon and Command.get(name).getAction()
+
+Like in FreeCAD, a workbench is only loaded when it is activated the first time,
+activating it fills its toolbars, hides the other ones and emits the
+workbenchActivated signal of the main window.
+"""
+
+import random
+import sys
+import tempfile
+import types
+
+from common import application
+
+application()
+
+from PySide.QtCore import Signal  # noqa: E402
+from PySide.QtGui import QColor, QIcon, QPixmap  # noqa: E402
+from PySide.QtWidgets import QAction, QMainWindow, QToolBar  # noqa: E402
+
+commandsPerToolbar = 10
+iconColors = 16
+#: commands of FreeCAD itself, the quick access buttons of the ribbon structure use them
+standardCommands = (
+    "Std_New",
+    "Std_Open",
+    "Std_Save",
+    "Std_Cut",
+    "Std_Copy",
+    "Std_Paste",
+    "Std_Undo",
+    "Std_Redo",
+    "Std_Refresh",
+)
+
+
+class ParameterGroup:
+    """
+    A parameter group as returned by App.ParamGet, observers are notified of changes.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.observers = []
+
+    def _get(self, name, default):
+        return self.values.get(name, default)
+
+    def _set(self, name, value):
+        self.values[name] = value
+        for observer in list(self.observers):
+            observer.onChange(self, name)
+
+    def GetInt(self, name, default=0):
+        return self._get(name, default)
+
+    def GetBool(self, name, default=False):
+        return self._get(name, default)
+
+    def GetString(self, name, default=""):
+        return self._get(name, default)
+
+    SetInt = SetBool = SetString = _set
+
+    def Attach(self, observer):
+        self.observers.append(observer)
+
+    def Detach(self, observer):
+        self.observers.remove(observer)
+
+
+class MainWindow(QMainWindow):
+    workbenchActivated = Signal(str)
+
+
+class Command:
+    """
+    A command with the action shown in toolbars, the action data holds its name.
+    """
+
+    def __init__(self, name: str, icon: QIcon, parent):
+        self.action = QAction(icon, name.replace("_", " "), parent)
+        self.action.setData(name)
+
+    def getAction(self):
+        return [self.action]
+
+
+class Workbench:
+    """
+    A workbench with synthetic toolbars, loaded on its first activation.
+    """
+
+    def __init__(self, name: str, menuText: str, toolbars: dict):
+        self._name = name
+        self.MenuText = menuText
+        self.Icon = ""
+        self._toolbars = toolbars
+
+    def name(self) -> str:
+        return self._name
+
+    def listToolbars(self) -> list:
+        return list(self._toolbars)
+
+    def getToolbarItems(self) -> dict:
+        return {toolbar: list(commands) for toolbar, commands in self._toolbars.items()}
+
+
+class FreeCADStandIn:
+    """
+    State of the stand-in modules: the main window, the commands and the workbenches.
+    """
+
+    def __init__(
+        self,
+        workbenchCount: int,
+        commandCount: int,
+        commandsPerWorkbench: int,
+        seed: int = 0,
+    ):
+        generator = random.Random(seed)
+        self.mainWindow = MainWindow()
+        self.parameters = {}
+        self.userAppDataDir = tempfile.mkdtemp(prefix="ribbon-benchmark-")
+
+        icons = []
+        for index in range(iconColors):
+            pixmap = QPixmap(64, 64)
+            pixmap.fill(QColor.fromHsv(index * 360 // iconColors, 160, 200))
+            icons.append(QIcon(pixmap))
+        self.commands = {}
+        for index in range(commandCount):
+            name = f"Std_Command{index}"
+            self.commands[name] = Command(
+                name, icons[index % iconColors], self.mainWindow
+            )
+
+        names = list(self.commands)
+        self.workbenches = {}
+        for index in range(workbenchCount):
+            menuText = f"Workbench {index}"
+            shown = generator.sample(names, min(commandsPerWorkbench, len(names)))
+            toolbars = {}
+            for start in range(0, len(shown), commandsPerToolbar):
+                toolbarName = f"{menuText} Tools {start // commandsPerToolbar}"
+                toolbars[toolbarName] = shown[start : start + commandsPerToolbar]
+            name = f"Workbench{index}Workbench"
+            self.workbenches[name] = Workbench(name, menuText, toolbars)
+        for name in standardCommands:
+            self.commands[name] = Command(name, icons[0], self.mainWindow)
+        self.activeWorkbench = None
+
+    def paramGet(self, path: str) -> ParameterGroup:
+        return self.parameters.setdefault(path, ParameterGroup())
+
+    def activateWorkbench(self, name: str):
+        workbench = self.workbenches[name]
+        if workbench is self.activeWorkbench:
+            return
+        self.activeWorkbench = workbench
+        workbench.__Workbench__ = workbench
+
+        toolbars = workbench.getToolbarItems()
+        for toolbar in self.mainWindow.findChildren(QToolBar):
+            if toolbar.objectName() not in toolbars:
+                toolbar.hide()
+        for toolbarName, commands in toolbars.items():
+            toolbar = self.mainWindow.findChild(QToolBar, toolbarName)
+            if toolbar is None:
+                toolbar = self.mainWindow.addToolBar(toolbarName)
+                toolbar.setObjectName(toolbarName)
+            toolbar.clear()
+            for commandName in commands:
+                toolbar.addAction(self.commands[commandName].action)
+            toolbar.show()
+        self.mainWindow.workbenchActivated.emit(name)
+
+
+def install(
+    workbenchCount: int, commandCount: int, commandsPerWorkbench: int = 60
+) -> FreeCADStandIn:
+    """
+    Register the stand-in modules as `FreeCAD` and `FreeCADGui`.
+    """
+
+    standIn = FreeCADStandIn(workbenchCount, commandCount, commandsPerWorkbench)
+
+    app = types.ModuleType("FreeCAD")
+    app.ParamGet = standIn.paramGet
+    app.Version = lambda: ["1", "0", "0", "benchmark"]
+    app.getUserAppDataDir = lambda: standIn.userAppDataDir
+    app.Console = types.SimpleNamespace(
+        PrintMessage=sys.stdout.write,
+        PrintWarning=sys.stderr.write,
+        PrintError=sys.stderr.write,
+    )
+
+    gui = types.ModuleType("FreeCADGui")
+    gui.getMainWindow = lambda: standIn.mainWindow
+    gui.listWorkbenches = lambda: dict(standIn.workbenches)
+    gui.getWorkbench = lambda name: standIn.workbenches[name]
+    gui.activeWorkbench = lambda: standIn.activeWorkbench
+    gui.activateWorkbench = standIn.activateWorkbench
+    gui.getIcon = lambda name: QIcon()
+    gui.Command = types.SimpleNamespace(get=standIn.commands.get)
+
+    sys.modules["FreeCAD"] = app
+    sys.modules["FreeCADGui"] = gui
+    return standIn
@@ -0,0 +1,139 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Cost of filling panels with 10 to 1000 items using RibbonGridLayoutManager.
+
+If numpy is installed, the previous numpy based implementation is measured as
+well and both are checked to place random item sequences identically.
+
+    python benchmarks/grid_allocator.py
+"""
+
+import random
+
+from common import measure, setupPySide
+
+setupPySide()
+
+from pyqtribbon.constants import ColumnWise, RowWise  # noqa: E402
+from pyqtribbon.panel import RibbonGridLayoutManager  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class NumpyGridLayoutManager(object):
+    """
+    The previous implementation, scanning every window of a numpy array.
+    """
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.cells = np.ones((rows, 1), dtype=bool)
+
+    def request_cells(self, rowSpan: int = 1, colSpan: int = 1, mode=ColumnWise):
+        if rowSpan > self.rows:
+            raise ValueError("RowSpan is too large")
+        if mode == ColumnWise:
+            for row in range(self.cells.shape[0] - rowSpan + 1):
+                for col in range(self.cells.shape[1] - colSpan + 1):
+                    if self.cells[row : row + rowSpan, col : col + colSpan].all():
+                        self.cells[row : row + rowSpan, col : col + colSpan] = False
+                        return row, col
+        else:
+            for col in range(self.cells.shape[1]):
+                if self.cells[0, col:].all():
+                    if self.cells.shape[1] - col < colSpan:
+                        self.cells = np.append(
+                            self.cells,
+                            np.ones(
+                                (self.rows, colSpan - (self.cells.shape[1] - col)),
+                                dtype=bool,
+                            ),
+                            axis=1,
+                        )
+                    self.cells[0, col:] = False
+                    return 0, col
+        cols = self.cells.shape[1]
+        colSpan1 = colSpan
+        if self.cells[:, -1].all():
+            cols -= 1
+            colSpan1 -= 1
+        self.cells = np.append(
+            self.cells, np.ones((self.rows, colSpan1), dtype=bool), axis=1
+        )
+        self.cells[:rowSpan, cols : cols + colSpan] = False
+        return 0, cols
+
+
+def randomRequests(count: int, rows: int, seed: int):
+    generator = random.Random(seed)
+    spans = (1, 2, 3, rows)  # small, medium and large buttons of a panel with 6 rows
+    return [
+        (
+            generator.choice(spans),
+            generator.choice((1, 1, 1, 2)),
+            RowWise if generator.random() < 0.05 else ColumnWise,
+        )
+        for _ in range(count)
+    ]
+
+
+def fill(managerClass, requests, rows: int):
+    manager = managerClass(rows)
+    return [manager.request_cells(*request) for request in requests]
+
+
+def checkEquivalence(rows: int = 6):
+    for seed in range(200):
+        requests = randomRequests(60, rows, seed)
+        expected = fill(NumpyGridLayoutManager, requests, rows)
+        result = fill(RibbonGridLayoutManager, requests, rows)
+        if expected != result:
+            raise AssertionError(f"placements differ for seed {seed}")
+    print("placements identical to the numpy implementation for 200 random panels")
+
+
+def main():
+    rows = 6
+    if np is not None:
+        checkEquivalence(rows)
+    for count in (10, 100, 1000):
+        requests = randomRequests(count, rows, count)
+        results = {
+            "bitmask": measure(lambda: fill(RibbonGridLayoutManager, requests, rows))
+        }
+        if np is not None:
+            results["numpy"] = measure(
+                lambda: fill(NumpyGridLayoutManager, requests, rows), 1
+            )
+        print(
+            f"{count:5d} items: "
+            + ", ".join(f"{name} {ms:9.2f} ms" for name, ms in results.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
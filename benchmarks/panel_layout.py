@@ -0,0 +1,99 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Cost of laying out a panel with 10 to 1000 buttons.
+
+Measures adding the buttons and resizing the panel, which lays out all of them
+again, for RibbonPanelLayout and for a QGridLayout fed with the same cells.
+
+    python benchmarks/panel_layout.py
+"""
+
+from common import application, measure
+
+app = application()
+
+from PySide import QtCore, QtWidgets  # noqa: E402
+
+from pyqtribbon.panel import RibbonGridLayoutManager, RibbonPanelLayout  # noqa: E402
+
+rows = 6
+rowSpans = (2, 2, 2, 3, 6)  # small, medium and large buttons
+
+
+def buttons(count: int):
+    result = []
+    for i in range(count):
+        button = QtWidgets.QToolButton()
+        button.setText(f"Button {i}")
+        result.append((button, rowSpans[i % len(rowSpans)]))
+    return result
+
+
+def fillPanelLayout(container, items):
+    layout = RibbonPanelLayout(rows, container)
+    for button, rowSpan in items:
+        layout.addWidget(button, rowSpan)
+    return layout
+
+
+def fillGridLayout(container, items):
+    layout = QtWidgets.QGridLayout(container)
+    manager = RibbonGridLayoutManager(rows)
+    for button, rowSpan in items:
+        row, col = manager.request_cells(rowSpan)
+        layout.addWidget(button, row, col, rowSpan, 1, QtCore.Qt.AlignCenter)
+    return layout
+
+
+def run(fill, count: int):
+    container = QtWidgets.QWidget()
+    items = buttons(count)
+    addTime = measure(lambda: fill(container, items), 1)
+    container.layout().activate()
+    heights = iter(range(100, 100 + 1000))
+
+    def resize():
+        for _ in range(20):
+            container.resize(container.sizeHint().width(), next(heights))
+            container.layout().activate()
+
+    resizeTime = measure(resize, 3) / 20
+    container.deleteLater()
+    return addTime, resizeTime
+
+
+def main():
+    for count in (10, 100, 1000):
+        results = []
+        for name, fill in (
+            ("RibbonPanelLayout", fillPanelLayout),
+            ("QGridLayout", fillGridLayout),
+        ):
+            addTime, resizeTime = run(fill, count)
+            results.append(f"{name} add {addTime:8.2f} ms, resize {resizeTime:7.3f} ms")
+        print(f"{count:5d} buttons: " + "; ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Micro-benchmarks of the pyqtribbon building blocks, checked against a baseline.
+
+Every benchmark times a single operation in isolation, its setup isn't timed. The
+results are compared with primitives_baseline.json, the run fails if one of them
+got slower than the baseline by more than the threshold, or if there is no
+baseline. The baseline depends on the machine, record it on the machine the
+comparison runs on:
+
+    python benchmarks/primitives.py --save-baseline
+    python benchmarks/primitives.py [--threshold 0.25] [--repeat 7]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+from common import application, measure
+
+app = application()
+
+from PySide import QtCore, QtGui  # noqa: E402
+
+from pyqtribbon import RibbonBar, RibbonStyle  # noqa: E402
+from pyqtribbon.constants import ColumnWise, RowWise  # noqa: E402
+from pyqtribbon.panel import RibbonGridLayoutManager, RibbonPanel  # noqa: E402
+from pyqtribbon.tabbar import RibbonTabBar  # noqa: E402
+
+baselineFileName = os.path.join(os.path.dirname(__file__), "primitives_baseline.json")
+icon = QtGui.QIcon()
+
+
+def release(*widgets):
+    for widget in widgets:
+        widget.deleteLater()
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def ribbon():
+    return RibbonBar("Benchmark", iconSize=24)
+
+
+def benchmarkRequestCells():
+    generator = random.Random(0)
+    requests = [
+        (
+            generator.choice((1, 2, 3, 6)),
+            generator.choice((1, 1, 1, 2)),
+            RowWise if generator.random() < 0.05 else ColumnWise,
+        )
+        for _ in range(1000)
+    ]
+
+    def run(manager):
+        for request in requests:
+            manager.request_cells(*request)
+
+    return run, lambda: RibbonGridLayoutManager(6)
+
+
+def benchmarkAddButton(method: str):
+    panels = []
+
+    def setup():
+        release(*panels)
+        panels[:] = [RibbonPanel("Panel")]
+        return panels[0]
+
+    def run(panel):
+        add = getattr(panel, method)
+        for index in range(100):
+            add(f"Button {index}", icon)
+
+    return run, setup
+
+
+def benchmarkAddPanel():
+    ribbons = []
+
+    def setup():
+        for r in ribbons:
+            r.dispose()
+        ribbons[:] = [ribbon()]
+        return ribbons[0].addCategory("Category")
+
+    def run(category):
+        for index in range(50):
+            category.addPanel(f"Panel {index}")
+
+    return run, setup
+
+
+def benchmarkAddCategory():
+    ribbons = []
+
+    def setup():
+        for r in ribbons:
+            r.dispose()
+        ribbons[:] = [ribbon()]
+        return ribbons[0]
+
+    def run(r):
+        for index in range(20):
+            r.addCategory(f"Category {index}")
+
+    return run, setup
+
+
+def benchmarkGalleryAddButton():
+    panels = []
+
+    def setup():
+        release(*panels)
+        panels[:] = [RibbonPanel("Panel")]
+        return panels[0].addGallery(minimumWidth=300)
+
+    def run(gallery):
+        for index in range(200):
+            gallery.addButton(f"Item {index}", icon)
+
+    return run, setup
+
+
+def benchmarkChangeColor():
+    tabBar = RibbonTabBar()
+    for index in range(30):
+        tabBar.addTab(f"Tab {index}", QtGui.QColor(index * 8, 0, 0))
+
+    def run(_):
+        # a single pass over the tabs is too short to time reliably
+        for _ in range(50):
+            for index in range(tabBar.count()):
+                tabBar.changeColor(index)
+
+    return run, lambda: None
+
+
+def benchmarkSetRibbonStyle():
+    r = ribbon()
+    for c in range(3):
+        category = r.addCategory(f"Category {c}")
+        for p in range(5):
+            panel = category.addPanel(f"Panel {p}")
+            for b in range(10):
+                panel.addSmallButton(f"Button {b}", icon)
+
+    def run(_):
+        for style in (RibbonStyle.Dark, RibbonStyle.Default) * 5:
+            r.setRibbonStyle(style)
+
+    return run, lambda: None
+
+
+#: name -> function returning the timed function and its setup
+benchmarks = {
+    "RibbonGridLayoutManager.request_cells x1000": benchmarkRequestCells,
+    "RibbonPanel.addSmallButton x100": lambda: benchmarkAddButton("addSmallButton"),
+    "RibbonPanel.addLargeButton x100": lambda: benchmarkAddButton("addLargeButton"),
+    "RibbonCategory.addPanel x50": benchmarkAddPanel,
+    "RibbonBar.addCategory x20": benchmarkAddCategory,
+    "RibbonGallery.addButton x200": benchmarkGalleryAddButton,
+    "RibbonTabBar.changeColor x1500": benchmarkChangeColor,
+    "RibbonBar.setRibbonStyle x10": benchmarkSetRibbonStyle,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store the results as baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown relative to the baseline, 0.25 means 25%%",
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="runs per benchmark")
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save_baseline and not os.path.exists(baselineFileName):
+        print(f"no baseline at {baselineFileName}, record one with --save-baseline")
+        sys.exit(1)
+    if os.path.exists(baselineFileName):
+        with open(baselineFileName, "r") as file:
+            data = json.load(file)
+        baseline = data["benchmarks"]
+        if data.get("qt") != QtCore.qVersion():
+            print(f"the baseline was recorded with Qt {data.get('qt')}")
+
+    results = {}
+    regressions = []
+    for name, benchmark in benchmarks.items():
+        run, setup = benchmark()
+        results[name] = measure(run, args.repeat, setup)
+        line = f"{name:45s} {results[name]:9.3f} ms"
+        if name in baseline:
+            ratio = results[name] / baseline[name]
+            line += f"  {ratio:5.2f}x baseline"
+            if ratio > 1 + args.threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save_baseline:
+        with open(baselineFileName, "w") as file:
+            json.dump({"qt": QtCore.qVersion(), "benchmarks": results}, file, indent=4)
+            file.write("\n")
+        print(f"baseline saved to {baselineFileName}")
+    elif regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline allows")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Check that ribbons are released completely by RibbonBar.dispose().
+
+Creates and disposes 1000 ribbons with categories, panels, buttons and a gallery,
+then compares the number of live widgets and the resident memory with the state
+after a warm-up. Exits with status 1 if widgets are left behind or the memory grew
+by more than the allowed amount.
+
+    python benchmarks/ribbon_lifecycle.py [count]
+"""
+
+import gc
+import sys
+
+from common import application, residentMemory
+
+app = application()
+
+from PySide import QtCore, QtGui, QtWidgets  # noqa: E402
+
+from pyqtribbon import RibbonBar  # noqa: E402
+
+warmUpCount = 100
+allowedGrowth = 8 * 1024 * 1024  # bytes, allocator caches don't shrink right away
+
+
+def createRibbon():
+    ribbon = RibbonBar("Ribbon", iconSize=24)
+    icon = QtGui.QIcon()
+    with ribbon.batchUpdate():
+        for c in range(3):
+            category = ribbon.addCategory(f"Category {c}")
+            for p in range(3):
+                panel = category.addPanel(f"Panel {p}")
+                for b in range(4):
+                    panel.addSmallButton(f"Button {b}", icon)
+                panel.addLargeButton("Large", icon).addRibbonMenu()
+        gallery = category.addPanel("Gallery").addGallery(minimumWidth=300)
+        for b in range(10):
+            gallery.addButton(f"Item {b}", icon)
+        ribbon.addLazyCategory("Lazy")
+    button = QtWidgets.QToolButton()
+    ribbon.addQuickAccessButton(button)
+    return ribbon
+
+
+def release():
+    # deleteLater only takes effect once deferred deletions are processed
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    app.processEvents()
+    gc.collect()
+
+
+def cycle(count: int):
+    for _ in range(count):
+        createRibbon().dispose()
+        release()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    cycle(warmUpCount)
+    widgets = len(QtWidgets.QApplication.allWidgets())
+    memory = residentMemory()
+
+    cycle(count)
+    widgetGrowth = len(QtWidgets.QApplication.allWidgets()) - widgets
+    memoryGrowth = residentMemory() - memory
+
+    print(f"{count} ribbons created and disposed")
+    print(f"  widgets left behind: {widgetGrowth}")
+    print(f"  resident memory growth: {memoryGrowth / 1024 / 1024:.1f} MB")
+    if widgetGrowth > 0 or memoryGrowth > allowedGrowth:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
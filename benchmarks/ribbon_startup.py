@@ -0,0 +1,116 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+End-to-end cost of the ribbon in FreeCAD, measured with the FreeCAD stand-in.
+
+For every setup of synthetic workbenches and commands, a separate process starts
+the ribbon like InitGui does, then shows every workbench tab once. Reported are
+the startup time including the first tab, the time to build the other tabs, the
+number of widgets afterwards and the resident memory of the process.
+
+    python benchmarks/ribbon_startup.py [workbenches:commands ...]
+"""
+
+import json
+import subprocess
+import sys
+import time
+
+from common import application, residentMemory
+
+#: workbenches and commands of the synthetic setups
+defaultSetups = ((5, 10), (20, 200), (50, 500), (100, 1000), (200, 2000))
+
+
+def runSetup(workbenchCount: int, commandCount: int) -> dict:
+    """
+    Start the ribbon and visit all tabs, in the current process.
+    """
+
+    import freecad_standin
+
+    standIn = freecad_standin.install(workbenchCount, commandCount)
+    app = application()
+
+    import FCBinding
+
+    mainWindow = standIn.mainWindow
+    mainWindow.workbenchActivated.connect(FCBinding.run)
+    start = time.perf_counter()
+    standIn.activateWorkbench(next(iter(standIn.workbenches)))
+    app.processEvents()
+    startup = time.perf_counter() - start
+
+    ribbon = mainWindow.findChild(FCBinding.ModernMenu)
+    tabBar = ribbon.tabBar()
+    tabTimes = []
+    for index in range(tabBar.count()):
+        if index == tabBar.currentIndex():
+            continue
+        start = time.perf_counter()
+        tabBar.setCurrentIndex(index)
+        app.processEvents()
+        tabTimes.append(time.perf_counter() - start)
+    tabTimes.sort()
+
+    return {
+        "workbenches": workbenchCount,
+        "commands": commandCount,
+        "startup": startup * 1000,
+        "tabMedian": tabTimes[len(tabTimes) // 2] * 1000 if tabTimes else 0.0,
+        "tabMaximum": tabTimes[-1] * 1000 if tabTimes else 0.0,
+        "widgets": len(app.allWidgets()),
+        "memory": residentMemory() / 1024 / 1024,
+    }
+
+
+def main():
+    if sys.argv[1:2] == ["--run"]:
+        workbenchCount, commandCount = (int(n) for n in sys.argv[2].split(":"))
+        print(json.dumps(runSetup(workbenchCount, commandCount)))
+        return
+
+    setups = [tuple(int(n) for n in a.split(":")) for a in sys.argv[1:]]
+    print(
+        "workbenches commands  startup ms  tab median ms  tab max ms"
+        "  widgets  memory MB"
+    )
+    for workbenchCount, commandCount in setups or defaultSetups:
+        # a fresh process per setup, so the memory of one doesn't count for the next
+        output = subprocess.run(
+            [sys.executable, __file__, "--run", f"{workbenchCount}:{commandCount}"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{result['workbenches']:11d} {result['commands']:8d}"
+            f" {result['startup']:11.1f} {result['tabMedian']:14.2f}"
+            f" {result['tabMaximum']:11.2f} {result['widgets']:8d}"
+            f" {result['memory']:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# ***********************************************************************
+# *                                                                     *
+# * Copyright (c) 2019 Hakan Seven <hakanseven12@gmail.com>             *
+# *                                                                     *
+# * This program is free software; you can redistribute it and/or modify*
+# * it under the terms of the GNU Lesser General Public License (LGPL)  *
+# * as published by the Free Software Foundation; either version 3 of   *
+# * the License, or (at your option) any later version.                 *
+# * for detail see the LICENCE text file.                               *
+# *                                                                     *
+# * This program is distributed in the hope that it will be useful,     *
+# * but WITHOUT ANY WARRANTY; without even the implied warranty of      *
+# * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the       *
+# * GNU Library General Public License for more details.                *
+# *                                                                     *
+# * You should have received a copy of the GNU Library General Public   *
+# * License along with this program; if not, write to the Free Software *
+# * Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307*
+# * USA                                                                 *
+# *                                                                     *
+# ***********************************************************************
+
+"""
+Cost of creating, styling and showing ribbon tool buttons.
+
+Compares buttons with their own menu indicator stylesheet, like they were styled
+before, with buttons styled by the `buttonStyle` property rules of base.qss.
+
+    python benchmarks/toolbutton_style.py [number of buttons]
+"""
+
+import sys
+
+from common import application, measure
+
+app = application()
+
+from PySide import QtWidgets  # noqa: E402
+
+from pyqtribbon.constants import Large, Small  # noqa: E402
+from pyqtribbon.ribbonbar import RibbonBar  # noqa: E402
+from pyqtribbon.toolbutton import RibbonToolButton  # noqa: E402
+
+menuIndicatorStyleSheet = """
+RibbonToolButton::menu-indicator {
+    subcontrol-origin: padding;
+    subcontrol-position: right;
+    right: -5px;
+}
+"""
+
+
+class StyleSheetToolButton(RibbonToolButton):
+    """
+    Button that sets its own stylesheet whenever its style changes.
+    """
+
+    def setButtonStyle(self, style):
+        super().setButtonStyle(style)
+        self.setStyleSheet(menuIndicatorStyleSheet)
+
+
+def build(buttonClass, count: int, deferred: bool):
+    ribbon = RibbonBar()
+    container = QtWidgets.QWidget(ribbon)
+    layout = QtWidgets.QHBoxLayout(container)
+    buttons = []
+
+    def create():
+        for i in range(count):
+            button = buttonClass(container)
+            button.setButtonStyle(Small if i % 2 else Large)
+            button.setMaximumIconSize(48)
+            button.setText(f"Button {i}")
+            layout.addWidget(button)
+            buttons.append(button)
+
+    def restyle():
+        # the buttons are polished by now, e.g. a panel collapsing its buttons
+        for i, button in enumerate(buttons):
+            button.setButtonStyle(Large if i % 2 else Small)
+
+    ribbon.show()
+    create()
+    app.processEvents()
+    if deferred:
+        with RibbonToolButton.deferredPolish():
+            restyle()
+    else:
+        restyle()
+    app.processEvents()
+    ribbon.deleteLater()
+    app.processEvents()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    results = {
+        "stylesheet per button": measure(
+            lambda: build(StyleSheetToolButton, count, False), 3
+        ),
+        "buttonStyle property": measure(
+            lambda: build(RibbonToolButton, count, False), 3
+        ),
+        "buttonStyle property, deferred polish": measure(
+            lambda: build(RibbonToolButton, count, True), 3
+        ),
+    }
+    for name, milliseconds in results.items():
+        print(f"{name:40s} {milliseconds:10.1f} ms for {count} buttons")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
+import contextlib
 import typing
 
 from PySide import QtCore, QtGui, QtWidgets
 
-from .constants import RibbonCategoryStyle
+from .constants import RibbonCategoryStyle, RibbonPanelSizeLevel
 from .panel import RibbonPanel
-from .separator import RibbonSeparator
-from .utils import DataFile
+from .toolbutton import RibbonToolButton
+from .utils import DataIcon, batchUpdates
 
 if typing.TYPE_CHECKING:
     from .ribbonbar import RibbonBar  # noqa: F401
 
 
+def hasTouchScreen() -> bool:
+    """Return whether a touch screen is connected."""
+    if hasattr(QtGui, "QInputDevice"):  # Qt 6
+        return any(
+            device.type() == QtGui.QInputDevice.DeviceType.TouchScreen for device in QtGui.QInputDevice.devices()
+        )
+    return any(device.type() == QtGui.QTouchDevice.TouchScreen for device in QtGui.QTouchDevice.devices())
+
+
 class RibbonCategoryLayoutButton(QtWidgets.QToolButton):
     """Previous/Next buttons in the category when the
     size is not enough for the widgets.
@@ -26,9 +36,28 @@ class RibbonCategoryScrollArea(QtWidgets.QScrollArea):
 
 
 class RibbonCategoryScrollAreaContents(QtWidgets.QFrame):
-    """Scroll area contents for the gallery"""
+    """Scroll area contents for the gallery, it draws the separators following the panels."""
 
-    pass
+    #: width of the separators, the panels are spaced to leave room for them
+    _separatorWidth: int = 10
+    #: space between a separator and its panels
+    _separatorSpacing: int = 5
+    #: margins of the separator lines at the top and the bottom
+    _separatorMargins: int = 4
+
+    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
+        """Override the paint event to draw a separator after every visible panel."""
+        super().paintEvent(a0)
+        layout = self.layout()
+        painter = QtGui.QPainter(self)
+        painter.setPen(QtGui.QColor(QtCore.Qt.gray))
+        top = self.rect().top() + self._separatorMargins
+        bottom = self.rect().bottom() - self._separatorMargins
+        for index in range(layout.count()):
+            widget = layout.itemAt(index).widget()
+            if isinstance(widget, RibbonPanel) and not widget.isHidden():
+                x = widget.geometry().right() + 1 + self._separatorSpacing + (self._separatorWidth - 1) // 2
+                painter.drawLine(x, top, x, bottom)
 
 
 class RibbonCategoryLayoutWidget(QtWidgets.QFrame):
@@ -36,20 +65,32 @@ class RibbonCategoryLayoutWidget(QtWidgets.QFrame):
 
     displayOptionsButtonClicked = QtCore.Signal()
 
+    #: exit stack of the open :meth:`batchUpdate` block, None outside of it
+    _batchStack: typing.Optional[contextlib.ExitStack] = None
+    #: distance scrolled by the scroll buttons and by a step of a mouse wheel
+    _scrollStep: int = 50
+    #: duration of animated scrolling in milliseconds
+    _scrollDuration: int = 150
+
     def __init__(self, parent=None):
         """Create a new category layout widget.
 
         :param parent: The parent widget.
         """
         super().__init__(parent)
+        #: (index, widget) waiting to be inserted into the category layout at the end of :meth:`batchUpdate`
+        self._pendingWidgets = []
 
         # Contents of the category scroll area
         self._categoryScrollAreaContents = RibbonCategoryScrollAreaContents()  # type: ignore
         self._categoryScrollAreaContents.setSizePolicy(
             QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)  # type: ignore
         self._categoryLayout = QtWidgets.QHBoxLayout(self._categoryScrollAreaContents)
-        self._categoryLayout.setContentsMargins(0, 0, 0, 0)
-        self._categoryLayout.setSpacing(5)
+        # leave room for the separators drawn after the panels
+        separatorWidth = RibbonCategoryScrollAreaContents._separatorWidth
+        separatorSpacing = RibbonCategoryScrollAreaContents._separatorSpacing
+        self._categoryLayout.setContentsMargins(0, 0, separatorSpacing + separatorWidth, 0)
+        self._categoryLayout.setSpacing(2 * separatorSpacing + separatorWidth)
         self._categoryLayout.setSizeConstraint(QtWidgets.QLayout.SetMinAndMaxSize)
 
         # Category scroll area
@@ -60,13 +101,13 @@ class RibbonCategoryLayoutWidget(QtWidgets.QFrame):
 
         # Previous/Next buttons
         self._previousButton = RibbonCategoryLayoutButton(self)
-        self._previousButton.setIcon(QtGui.QIcon(DataFile("icons/backward.png")))
+        self._previousButton.setIcon(DataIcon("icons/backward.png"))
         self._previousButton.setIconSize(QtCore.QSize(12, 12))
         self._previousButton.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
         self._previousButton.setAutoRaise(True)
         self._previousButton.clicked.connect(self.scrollPrevious)  # type: ignore
         self._nextButton = RibbonCategoryLayoutButton(self)
-        self._nextButton.setIcon(QtGui.QIcon(DataFile("icons/forward.png")))
+        self._nextButton.setIcon(DataIcon("icons/forward.png"))
         self._nextButton.setIconSize(QtCore.QSize(12, 12))
         self._nextButton.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
         self._nextButton.setAutoRaise(True)
@@ -82,52 +123,124 @@ class RibbonCategoryLayoutWidget(QtWidgets.QFrame):
                                                              QtWidgets.QSizePolicy.Minimum))  # fmt: skip
         self._mainLayout.addWidget(self._nextButton, 0, QtCore.Qt.AlignVCenter)
 
-        # Auto set the visibility of the scroll buttons
+        # The scroll buttons follow the scroll bar, painting doesn't touch them
+        horizontalScrollBar = self._categoryScrollArea.horizontalScrollBar()
+        horizontalScrollBar.rangeChanged.connect(self.autoSetScrollButtonsVisible)  # type: ignore
+        horizontalScrollBar.valueChanged.connect(self.autoSetScrollButtonsVisible)  # type: ignore
         self.autoSetScrollButtonsVisible()
 
-    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
-        """Override the paint event to draw the background."""
-        super().paintEvent(a0)
-        self.autoSetScrollButtonsVisible()
+        # Smooth scrolling, wheel events are handled before the scroll area scrolls vertically
+        self._scrollAnimation = QtCore.QPropertyAnimation(horizontalScrollBar, b"value", self)
+        self._scrollAnimation.setDuration(self._scrollDuration)
+        self._scrollAnimation.setEasingCurve(QtCore.QEasingCurve.OutCubic)
+        self._categoryScrollArea.viewport().installEventFilter(self)
+        if hasTouchScreen():
+            # every grab registers a gesture recognizer of its own, so it is only done where it is used
+            QtWidgets.QScroller.grabGesture(self._categoryScrollArea.viewport(), QtWidgets.QScroller.TouchGesture)
+
+    def eventFilter(self, a0: QtCore.QObject, a1: QtCore.QEvent) -> bool:
+        if a0 is self._categoryScrollArea.viewport() and a1.type() == QtCore.QEvent.Wheel:
+            self._wheelScroll(a1)
+            return True
+        return super().eventFilter(a0, a1)
 
     def resizeEvent(self, a0: QtGui.QResizeEvent) -> None:
-        """Override the resize event to resize the scroll area."""
+        """Override the resize event to fit the scroll buttons to the height."""
         super().resizeEvent(a0)
-        self.autoSetScrollButtonsVisible()
+        if a0.size().height() != a0.oldSize().height():
+            iconSize = QtCore.QSize(12, a0.size().height() - 15)
+            self._previousButton.setIconSize(iconSize)
+            self._nextButton.setIconSize(iconSize)
 
     def autoSetScrollButtonsVisible(self):
-        """Set the visibility of the scroll buttons."""
+        """Set the visibility of the scroll buttons.
+
+        It is called when the range or the value of the horizontal scroll bar changes.
+        """
+        horizontalScrollBar = self._categoryScrollArea.horizontalScrollBar()
+        previousVisible = horizontalScrollBar.value() > horizontalScrollBar.minimum()
+        nextVisible = horizontalScrollBar.value() < horizontalScrollBar.maximum()
+        if self._previousButton.isHidden() == previousVisible:
+            self._previousButton.setVisible(previousVisible)
+        if self._nextButton.isHidden() == nextVisible:
+            self._nextButton.setVisible(nextVisible)
+
+    def scrollBy(self, dx: int):
+        """Scroll the category smoothly, subsequent calls continue from the target of a running scroll.
+
+        :param dx: The distance to scroll in pixels, negative values scroll to the left.
+        """
         horizontalScrollBar = self._categoryScrollArea.horizontalScrollBar()
-        self._previousButton.setVisible(horizontalScrollBar.value() > horizontalScrollBar.minimum())
-        self._nextButton.setVisible(horizontalScrollBar.value() < horizontalScrollBar.maximum())
-        self._previousButton.setIconSize(QtCore.QSize(12, self.size().height() - 15))
-        self._nextButton.setIconSize(QtCore.QSize(12, self.size().height() - 15))
+        target = horizontalScrollBar.value()
+        if self._scrollAnimation.state() == QtCore.QAbstractAnimation.Running:
+            target = self._scrollAnimation.endValue()
+        target = min(max(target + dx, horizontalScrollBar.minimum()), horizontalScrollBar.maximum())
+        self._scrollAnimation.stop()
+        if target != horizontalScrollBar.value():
+            self._scrollAnimation.setStartValue(horizontalScrollBar.value())
+            self._scrollAnimation.setEndValue(target)
+            self._scrollAnimation.start()
+
+    def _wheelScroll(self, event: QtGui.QWheelEvent):
+        pixelDelta = event.pixelDelta()
+        if not pixelDelta.isNull():
+            # touchpads report the distance in pixels, it is applied as it is
+            self._scrollAnimation.stop()
+            horizontalScrollBar = self._categoryScrollArea.horizontalScrollBar()
+            horizontalScrollBar.setValue(horizontalScrollBar.value() - (pixelDelta.x() or pixelDelta.y()))
+        else:
+            # a step of a mouse wheel is 120, high resolution wheels report fractions of it
+            angleDelta = event.angleDelta()
+            self.scrollBy(-round((angleDelta.x() or angleDelta.y()) * self._scrollStep / 120))
 
     def scrollPrevious(self):
         """Scroll the category to the previous widget."""
-        horizontalScrollBar = self._categoryScrollArea.horizontalScrollBar()
-        horizontalScrollBar.setValue(horizontalScrollBar.value() - 50)
-        self.autoSetScrollButtonsVisible()
+        self.scrollBy(-self._scrollStep)
 
     def scrollNext(self):
         """Scroll the category to the next widget."""
-        self._categoryScrollArea.horizontalScrollBar().setValue(
-            self._categoryScrollArea.horizontalScrollBar().value() + 50
-        )
-        self.autoSetScrollButtonsVisible()
+        self.scrollBy(self._scrollStep)
+
+    @contextlib.contextmanager
+    def batchUpdate(self):
+        """Add many widgets at once, the category is laid out and its buttons are repolished once at the end.
+
+        Updates of the category are suspended and the widgets are inserted into the layout when the outermost
+        block ends. Panels added to a category in the block are batched until its end as well.
+        """
+        with RibbonToolButton.deferredPolish(), batchUpdates(self, self._flushPendingWidgets):
+            yield self
+
+    def _flushPendingWidgets(self):
+        widgets, self._pendingWidgets = self._pendingWidgets, []
+        for index, widget in widgets:
+            self._categoryLayout.insertWidget(index, widget)
 
     def addWidget(self, widget: QtWidgets.QWidget):
         """Add a widget to the category layout.
 
         :param widget: The widget to add.
         """
-        self._categoryLayout.addWidget(widget)
+        self.insertWidget(-1, widget)
+
+    def insertWidget(self, index: int, widget: QtWidgets.QWidget):
+        """Insert a widget into the category layout.
+
+        :param index: The index to insert the widget at.
+        :param widget: The widget to insert.
+        """
+        if self._batchStack is not None:
+            self._pendingWidgets.append((index, widget))
+        else:
+            self._categoryLayout.insertWidget(index, widget)
 
     def removeWidget(self, widget: QtWidgets.QWidget):
         """Remove a widget from the category layout.
 
         :param widget: The widget to remove.
         """
+        # the indices of the pending insertions refer to the layout with the widget
+        self._flushPendingWidgets()
         self._categoryLayout.removeWidget(widget)
 
     def takeWidget(self, widget: QtWidgets.QWidget) -> QtWidgets.QWidget:
@@ -136,10 +249,59 @@ class RibbonCategoryLayoutWidget(QtWidgets.QFrame):
         :param widget: The widget to remove.
         :return: The widget that was removed.
         """
-        self._categoryLayout.removeWidget(widget)
+        self.removeWidget(widget)
         return widget
 
 
+class RibbonPanelLevelSolver(object):
+    """Chooses the size levels of panels, so that they fit into a width.
+
+    The panels are reduced from right to left, one level at a time, until they fit. The solutions are memoized
+    per width bucket, a solution is computed for the lower end of its bucket, so it fits every width of the bucket.
+    """
+
+    def __init__(self, bucketSize: int = 16):
+        """Create a new solver.
+
+        :param bucketSize: The size of the width buckets in pixels.
+        """
+        self._bucketSize = bucketSize
+        self._widths: typing.List[typing.List[int]] = []
+        self._solutions: typing.Dict[int, typing.Tuple[int, ...]] = {}
+
+    def solve(self, widths: typing.List[typing.List[int]], width: int) -> typing.Tuple[int, ...]:
+        """Choose the size levels of the panels.
+
+        :param widths: The widths of each panel at its size levels, from the widest level on.
+        :param width: The available width.
+        :return: The index of the level of each panel, the panels are collapsed as far as possible if they
+                 don't fit at all.
+        """
+        if widths != self._widths:
+            self._widths = [list(panelWidths) for panelWidths in widths]
+            self._solutions.clear()
+        bucket = max(width, 0) // self._bucketSize
+        solution = self._solutions.get(bucket)
+        if solution is None:
+            solution = self._solutions[bucket] = self._solve(bucket * self._bucketSize)
+        return solution
+
+    def _solve(self, width: int) -> typing.Tuple[int, ...]:
+        levels = [0] * len(self._widths)
+        total = sum(panelWidths[0] for panelWidths in self._widths)
+        maximumLevel = max((len(panelWidths) - 1 for panelWidths in self._widths), default=0)
+        for level in range(1, maximumLevel + 1):
+            for index in reversed(range(len(self._widths))):
+                if total <= width:
+                    return tuple(levels)
+                panelWidths = self._widths[index]
+                # levels that don't make the panel narrower are skipped
+                if level < len(panelWidths) and panelWidths[level] < panelWidths[levels[index]]:
+                    total += panelWidths[level] - panelWidths[levels[index]]
+                    levels[index] = level
+        return tuple(levels)
+
+
 class RibbonCategory(RibbonCategoryLayoutWidget):
     """The RibbonCategory is the logical grouping that represents the contents of a ribbon tab."""
 
@@ -153,6 +315,8 @@ class RibbonCategory(RibbonCategoryLayoutWidget):
     _color: typing.Optional[QtGui.QColor]
     #: Maximum rows
     _maxRows: int = 6
+    #: whether the size levels of the panels follow the width of the category
+    _adaptiveLayout: bool = True
 
     @typing.overload
     def __init__(
@@ -194,6 +358,71 @@ class RibbonCategory(RibbonCategoryLayoutWidget):
         self._panels = {}
         self._ribbon = parent  # type: RibbonBar
         self._color = color
+        self._levelSolver = RibbonPanelLevelSolver()
+        # the panels are adapted again when their sizes change
+        self._categoryScrollAreaContents.installEventFilter(self)
+
+    def eventFilter(self, a0: QtCore.QObject, a1: QtCore.QEvent) -> bool:
+        if a0 is self._categoryScrollAreaContents and a1.type() == QtCore.QEvent.LayoutRequest:
+            self.adaptPanels()
+        return super().eventFilter(a0, a1)
+
+    def resizeEvent(self, a0: QtGui.QResizeEvent) -> None:
+        """Override the resize event to adapt the panels to the width."""
+        super().resizeEvent(a0)
+        self.adaptPanels()
+
+    def showEvent(self, a0: QtGui.QShowEvent) -> None:
+        """Override the show event to adapt the panels to the width."""
+        super().showEvent(a0)
+        self.adaptPanels()
+
+    def adaptiveLayout(self) -> bool:
+        """Return whether the size levels of the panels follow the width of the category."""
+        return self._adaptiveLayout
+
+    def setAdaptiveLayout(self, adaptive: bool):
+        """Set whether the size levels of the panels follow the width of the category.
+
+        :param adaptive: Whether the panels are reduced when they don't fit, they are shown at full size otherwise.
+        """
+        self._adaptiveLayout = adaptive
+        if adaptive:
+            self.adaptPanels()
+        else:
+            for panel in self._panels.values():
+                panel.setSizeLevel(RibbonPanelSizeLevel.Full)
+
+    def adaptPanels(self):
+        """Set the size levels of the panels, so that they fit into the width of the category.
+
+        Panels are reduced from right to left, first to medium buttons, then to small buttons and finally to a
+        single button, as far as needed. The widths of the panels at their size levels are measured once and the
+        choice is memoized per width, so resizing the category doesn't lay out the panels on trial.
+        """
+        if not self._adaptiveLayout or self._batchStack is not None or not self.isVisible():
+            return
+        panels = [
+            widget
+            for widget in (self._categoryLayout.itemAt(index).widget() for index in range(self._categoryLayout.count()))
+            if isinstance(widget, RibbonPanel) and not widget.isHidden()
+        ]
+        if not panels:
+            return
+        margins = self._mainLayout.contentsMargins()
+        contentsMargins = self._categoryLayout.contentsMargins()
+        width = (
+            self.width()
+            - margins.left()
+            - margins.right()
+            - 2 * self._categoryScrollArea.frameWidth()
+            - contentsMargins.left()
+            - contentsMargins.right()
+            - self._categoryLayout.spacing() * (len(panels) - 1)
+        )
+        levels = self._levelSolver.solve([panel.levelWidths() for panel in panels], width)
+        for panel, level in zip(panels, levels):
+            panel.setSizeLevel(level)
 
     def setMaximumRows(self, rows: int):
         """Set the maximum number of rows.
@@ -254,15 +483,26 @@ class RibbonCategory(RibbonCategoryLayoutWidget):
         :return: A dictionary of the newly created panels.
         """
         panels = {}
-        for title, panel_data in data.items():
-            showPanelOptionButton = panel_data.get("showPanelOptionButton", True)
-            panels[title] = self.addPanel(title, showPanelOptionButton)
-            panels[title].addWidgetsBy(panel_data.get("widgets", {}))
+        with self.batchUpdate():
+            for title, panel_data in data.items():
+                showPanelOptionButton = panel_data.get("showPanelOptionButton", True)
+                panels[title] = self.addPanel(title, showPanelOptionButton)
+                panels[title].addWidgetsBy(panel_data.get("widgets", {}))
         return panels
 
     def addPanel(self, title: str, showPanelOptionButton=True) -> RibbonPanel:
         """Add a new panel to the category.
 
+        :param title: The title of the panel.
+        :param showPanelOptionButton: Whether to show the panel option button.
+        :return: The newly created panel.
+        """
+        return self.insertPanel(len(self._panels), title, showPanelOptionButton)
+
+    def insertPanel(self, index: int, title: str, showPanelOptionButton=True) -> RibbonPanel:
+        """Insert a new panel into the category.
+
+        :param index: The position of the panel among the panels of the category.
         :param title: The title of the panel.
         :param showPanelOptionButton: Whether to show the panel option button.
         :return: The newly created panel.
@@ -274,9 +514,11 @@ class RibbonCategory(RibbonCategoryLayoutWidget):
             - self._mainLayout.contentsMargins().top()
             - self._mainLayout.contentsMargins().bottom()
         )
+        if self._batchStack is not None:
+            self._batchStack.enter_context(panel.batchUpdate())
         self._panels[title] = panel
-        self.addWidget(panel)  # type: ignore
-        self.addWidget(RibbonSeparator(width=10))  # type: ignore
+        # the separator following the panel is drawn by the scroll area contents
+        self.insertWidget(index, panel)  # type: ignore
         return panel
 
     def removePanel(self, title: str):
@@ -39,10 +39,12 @@ RowWise = RibbonSpaceFindMode.RowWise
 class RibbonStyle(IntEnum):
     Default = 0
     Debug = 1
+    Dark = 2
 
 
 Debug = RibbonStyle.Debug
 Default = RibbonStyle.Default
+Dark = RibbonStyle.Dark
 
 
 class RibbonButtonStyle(IntEnum):
@@ -56,3 +58,16 @@ class RibbonButtonStyle(IntEnum):
 Small = RibbonButtonStyle.Small
 Medium = RibbonButtonStyle.Medium
 Large = RibbonButtonStyle.Large
+
+
+class RibbonPanelSizeLevel(IntEnum):
+    """Size level of a panel, panels are reduced level by level when a category runs out of space.
+
+    At the Reduced level large buttons are shown as medium buttons, at the Compact level all buttons are shown
+    as small buttons, a Collapsed panel is shown as a single button with a menu of its buttons.
+    """
+
+    Full = 0
+    Reduced = 1
+    Compact = 2
+    Collapsed = 3
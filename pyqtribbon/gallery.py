@@ -4,8 +4,8 @@ from PySide import QtCore, QtGui, QtWidgets
 
 from .menu import RibbonPermanentMenu
 from .separator import RibbonHorizontalSeparator
-from .toolbutton import RibbonToolButton
-from .utils import DataFile
+from .thumbnails import ThumbnailSource, placeholderIcon, thumbnailLoader
+from .utils import DataIcon
 
 
 class RibbonPopupWidget(QtWidgets.QFrame):
@@ -14,22 +14,385 @@ class RibbonPopupWidget(QtWidgets.QFrame):
     pass
 
 
-class RibbonGalleryListWidget(QtWidgets.QListWidget):
-    """Gallery list widget."""
+class RibbonGalleryItem(QtCore.QObject):
+    """An item of the gallery, it holds the data the gallery views paint, there is no widget per item.
+
+    Items replace the tool buttons galleries used to create, the parts of the button API that apply to an item
+    without a widget, like menus, shortcuts and the enabled state, are kept.
+    """
+
+    #: Signal, the item was clicked, the argument is the check state after the click.
+    clicked = QtCore.Signal(bool)
+    #: Signal, the check state of the item changed.
+    toggled = QtCore.Signal(bool)
+
+    # the rarely changed button properties are class defaults, so adding items stays cheap
+    _enabled = True
+    _menu: typing.Optional[QtWidgets.QMenu] = None
+    _popupMode = QtWidgets.QToolButton.DelayedPopup
+    _shortcutAction: typing.Optional[QtWidgets.QAction] = None
+
+    def __init__(
+        self,
+        model: "RibbonGalleryModel",
+        row: int,
+        text: str = None,
+        icon: QtGui.QIcon = None,
+        tooltip: str = None,
+        statusTip: str = None,
+        checkable: bool = False,
+        thumbnail: ThumbnailSource = None,
+        thumbnailKey=None,
+    ):
+        """Create a new gallery item.
+
+        :param model: The model the item belongs to.
+        :param row: The row of the item in the model.
+        :param text: The text of the item.
+        :param icon: The icon of the item.
+        :param tooltip: The tooltip of the item.
+        :param statusTip: The status tip of the item.
+        :param checkable: Whether the item is checkable.
+        :param thumbnail: The source of the icon, loaded in the background, used instead of `icon`.
+        :param thumbnailKey: The key of the thumbnail in the cache, the path or the callable if None.
+        """
+        super().__init__(model)
+        self._model = model
+        self._row = row
+        self._text = text
+        self._icon = icon
+        self._toolTip = tooltip
+        self._statusTip = statusTip
+        self._checkable = checkable
+        self._checked = False
+        self._thumbnail = thumbnail
+        self._thumbnailKey = thumbnailKey if thumbnailKey is not None else thumbnail
+
+    def row(self) -> int:
+        """Return the row of the item in the gallery."""
+        return self._row
+
+    def text(self) -> typing.Optional[str]:
+        """Return the text of the item."""
+        return self._text
+
+    def setText(self, text: str):
+        """Set the text of the item.
+
+        :param text: The text of the item.
+        """
+        self._text = text
+        self._model.itemChanged(self._row)
+
+    def icon(self) -> typing.Optional[QtGui.QIcon]:
+        """Return the icon of the item."""
+        return self._icon
+
+    def setIcon(self, icon: QtGui.QIcon):
+        """Set the icon of the item, it replaces the thumbnail.
+
+        :param icon: The icon of the item.
+        """
+        self._icon = icon
+        self._thumbnail = self._thumbnailKey = None
+        self._model.itemChanged(self._row)
+
+    def thumbnail(self) -> typing.Optional[ThumbnailSource]:
+        """Return the source of the thumbnail of the item."""
+        return self._thumbnail
+
+    def thumbnailKey(self):
+        """Return the key of the thumbnail of the item."""
+        return self._thumbnailKey
+
+    def toolTip(self) -> typing.Optional[str]:
+        """Return the tooltip of the item."""
+        return self._toolTip
+
+    def setToolTip(self, tooltip: str):
+        """Set the tooltip of the item.
+
+        :param tooltip: The tooltip of the item.
+        """
+        self._toolTip = tooltip
+
+    def statusTip(self) -> typing.Optional[str]:
+        """Return the status tip of the item."""
+        return self._statusTip
+
+    def setStatusTip(self, statusTip: str):
+        """Set the status tip of the item.
+
+        :param statusTip: The status tip of the item.
+        """
+        self._statusTip = statusTip
+
+    def isCheckable(self) -> bool:
+        """Return whether the item is checkable."""
+        return self._checkable
+
+    def setCheckable(self, checkable: bool):
+        """Set whether the item is checkable.
+
+        :param checkable: Whether the item is checkable.
+        """
+        self._checkable = checkable
+        if not checkable:
+            self.setChecked(False)
+
+    def isChecked(self) -> bool:
+        """Return whether the item is checked."""
+        return self._checked
+
+    def setChecked(self, checked: bool):
+        """Set whether the item is checked, only checkable items can be checked.
+
+        :param checked: Whether the item is checked.
+        """
+        checked = checked and self._checkable
+        if checked != self._checked:
+            self._checked = checked
+            self._model.itemChanged(self._row)
+            self.toggled.emit(checked)
+
+    def isEnabled(self) -> bool:
+        """Return whether the item is enabled."""
+        return self._enabled
+
+    def setEnabled(self, enabled: bool):
+        """Set whether the item is enabled, disabled items are grayed out and can't be clicked.
+
+        :param enabled: Whether the item is enabled.
+        """
+        self._enabled = enabled
+        self._model.itemChanged(self._row)
+
+    def menu(self) -> typing.Optional[QtWidgets.QMenu]:
+        """Return the menu of the item."""
+        return self._menu
+
+    def setMenu(self, menu: QtWidgets.QMenu):
+        """Set the menu of the item, it is shown on a right click, or on every click with
+        :attr:`QtWidgets.QToolButton.InstantPopup`, see :meth:`setPopupMode`.
+
+        :param menu: The menu of the item.
+        """
+        self._menu = menu
+
+    def popupMode(self) -> QtWidgets.QToolButton.ToolButtonPopupMode:
+        """Return how the menu of the item is shown."""
+        return self._popupMode
+
+    def setPopupMode(self, mode: QtWidgets.QToolButton.ToolButtonPopupMode):
+        """Set how the menu of the item is shown, items have no menu arrow and can't be held down, so
+        :attr:`QtWidgets.QToolButton.InstantPopup` shows the menu instead of clicking the item, the other modes
+        show it on a right click.
+
+        :param mode: The popup mode.
+        """
+        self._popupMode = mode
+
+    def showMenu(self, position: QtCore.QPoint = None):
+        """Show the menu of the item, if it has one.
+
+        :param position: The global position of the menu, the cursor position if None.
+        """
+        if self._menu is not None:
+            self._menu.popup(position if position is not None else QtGui.QCursor.pos())
+
+    def shortcut(self) -> QtGui.QKeySequence:
+        """Return the shortcut of the item."""
+        return self._shortcutAction.shortcut() if self._shortcutAction is not None else QtGui.QKeySequence()
+
+    def setShortcut(self, shortcut: typing.Union[QtGui.QKeySequence, str]):
+        """Set the shortcut of the item, it clicks the item while the gallery is shown.
+
+        :param shortcut: The shortcut of the item.
+        """
+        if self._shortcutAction is None:
+            # the action is only created for items with a shortcut, it has to belong to the gallery widget
+            self._shortcutAction = QtWidgets.QAction(self)
+            self._shortcutAction.triggered.connect(self.click)  # type: ignore
+            gallery = self._model.parent()
+            if isinstance(gallery, QtWidgets.QWidget):
+                gallery.addAction(self._shortcutAction)
+        self._shortcutAction.setShortcut(shortcut)
+
+    def click(self):
+        """Click the item, checkable items toggle their check state."""
+        if not self._enabled:
+            return
+        if self._menu is not None and self._popupMode == QtWidgets.QToolButton.InstantPopup:
+            self.showMenu()
+            return
+        if self._checkable:
+            self.setChecked(not self._checked)
+        self.clicked.emit(self._checked)
+
+
+class RibbonGalleryModel(QtCore.QAbstractListModel):
+    """The items of a gallery, shared by the gallery and its popup."""
+
+    #: size of the thumbnails in device independent pixels
+    _thumbnailSize = 64
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setViewMode(QtWidgets.QListWidget.IconMode)
-        self.setResizeMode(QtWidgets.QListWidget.Adjust)
-        self.setVerticalScrollMode(QtWidgets.QListWidget.ScrollPerPixel)
+        self._items: typing.List[RibbonGalleryItem] = []
+        #: thumbnail key -> rows waiting for the thumbnail
+        self._thumbnailRows: typing.Dict[typing.Any, typing.List[int]] = {}
+        thumbnailLoader().thumbnailReady.connect(self._thumbnailReady)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self._items[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return item.text()
+        elif role == QtCore.Qt.DecorationRole:
+            if item.thumbnail() is not None:
+                return self._thumbnailIcon(item)
+            return item.icon()
+        elif role == QtCore.Qt.ToolTipRole:
+            return item.toolTip()
+        elif role == QtCore.Qt.StatusTipRole:
+            return item.statusTip()
+        elif role == QtCore.Qt.CheckStateRole and item.isCheckable():
+            return QtCore.Qt.Checked if item.isChecked() else QtCore.Qt.Unchecked
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        # items are toggled by the gallery, not by the check box handling of the views
+        if index.isValid() and self._items[index.row()].isEnabled():
+            return QtCore.Qt.ItemIsEnabled
+        return QtCore.Qt.NoItemFlags
+
+    def item(self, row: int) -> RibbonGalleryItem:
+        """Return the item of a row.
+
+        :param row: The row.
+        :return: The item.
+        """
+        return self._items[row]
+
+    def items(self) -> typing.List[RibbonGalleryItem]:
+        """Return all items."""
+        return self._items
+
+    def addItem(self, **kwargs) -> RibbonGalleryItem:
+        """Add a new item.
+
+        :param kwargs: The arguments of :class:`RibbonGalleryItem`.
+        :return: The new item.
+        """
+        row = len(self._items)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        item = RibbonGalleryItem(self, row, **kwargs)
+        self._items.append(item)
+        self.endInsertRows()
+        return item
+
+    def _thumbnailIcon(self, item: RibbonGalleryItem) -> QtGui.QIcon:
+        # only visible items are painted, so thumbnails are loaded when they are scrolled into view
+        size = int(self._thumbnailSize * QtWidgets.QApplication.instance().devicePixelRatio())
+        icon = thumbnailLoader().thumbnail(item.thumbnailKey(), item.thumbnail(), QtCore.QSize(size, size))
+        if icon is None:
+            rows = self._thumbnailRows.setdefault(item.thumbnailKey(), [])
+            if item.row() not in rows:
+                rows.append(item.row())
+            return placeholderIcon()
+        return icon
+
+    def _thumbnailReady(self, key):
+        for row in self._thumbnailRows.pop(key, []):
+            self.itemChanged(row)
+
+    def itemChanged(self, row: int):
+        """Repaint an item in all views.
+
+        :param row: The row of the item.
+        """
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index)
+
+
+class RibbonGalleryDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints the gallery items like ribbon tool buttons with the text under the icon."""
+
+    #: space around the icon and the text of an item
+    _margin = 4
+
+    def sizeHint(self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex) -> QtCore.QSize:
+        # all items have the same size, so the view can lay them out without asking every item
+        iconSize = option.decorationSize
+        return QtCore.QSize(
+            int(iconSize.width() * 1.5) + self._margin * 2,
+            iconSize.height() + option.fontMetrics.height() + self._margin * 3,
+        )
+
+    def paint(self, painter: QtGui.QPainter, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex):
+        item = index.model().item(index.row())
+        buttonOption = QtWidgets.QStyleOptionToolButton()
+        buttonOption.rect = option.rect
+        buttonOption.palette = option.palette
+        buttonOption.font = option.font
+        buttonOption.fontMetrics = option.fontMetrics
+        buttonOption.iconSize = option.decorationSize
+        icon = index.data(QtCore.Qt.DecorationRole)
+        buttonOption.icon = icon if icon is not None else QtGui.QIcon()
+        if item.text():
+            buttonOption.text = option.fontMetrics.elidedText(
+                item.text(), QtCore.Qt.ElideRight, option.rect.width() - self._margin * 2
+            )
+            buttonOption.toolButtonStyle = QtCore.Qt.ToolButtonTextUnderIcon
+        else:
+            buttonOption.toolButtonStyle = QtCore.Qt.ToolButtonIconOnly
+        buttonOption.subControls = QtWidgets.QStyle.SC_ToolButton
+        buttonOption.state = QtWidgets.QStyle.State_AutoRaise
+        if item.isEnabled():
+            buttonOption.state |= QtWidgets.QStyle.State_Enabled
+        if item.isEnabled() and option.state & QtWidgets.QStyle.State_MouseOver:
+            buttonOption.state |= QtWidgets.QStyle.State_MouseOver | QtWidgets.QStyle.State_Raised
+        if item.isChecked():
+            buttonOption.state |= QtWidgets.QStyle.State_On
+        # no widget is passed, so the rules of the view don't apply to the items
+        style = option.widget.style() if option.widget is not None else QtWidgets.QApplication.style()
+        style.drawComplexControl(QtWidgets.QStyle.CC_ToolButton, buttonOption, painter, None)
+
+
+class RibbonGalleryListWidget(QtWidgets.QListView):
+    """Gallery list view, only the visible items of the gallery model are painted."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QtWidgets.QListView.IconMode)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
+        self.setMovement(QtWidgets.QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setMouseTracking(True)
+        self.setVerticalScrollMode(QtWidgets.QListView.ScrollPerPixel)
         self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
         self.setIconSize(QtCore.QSize(64, 64))
+        self.setItemDelegate(RibbonGalleryDelegate(self))
 
     def resizeEvent(self, e: QtGui.QResizeEvent) -> None:
         """Resize the list widget."""
         super().resizeEvent(e)
 
+    def contextMenuEvent(self, e: QtGui.QContextMenuEvent) -> None:
+        """Show the menu of the item under the cursor."""
+        index = self.indexAt(e.pos())
+        item = self.model().item(index.row()) if index.isValid() else None
+        if item is not None and item.isEnabled() and item.menu() is not None:
+            item.showMenu(e.globalPos())
+        else:
+            super().contextMenuEvent(e)
+
     def scrollToNextRow(self) -> None:
         """Scroll to the next row."""
         self.verticalScrollBar().setValue(self.verticalScrollBar().value() + self.verticalScrollBar().singleStep())
@@ -57,8 +420,6 @@ class RibbonGallery(QtWidgets.QFrame):
     """A widget that displays a gallery of buttons."""
 
     _popupWindowSize = QtCore.QSize(500, 500)
-    _buttons: typing.List[RibbonToolButton] = []
-    _popupButtons: typing.List[RibbonToolButton] = []
     _popupHideOnClick = False
 
     @typing.overload
@@ -95,17 +456,17 @@ class RibbonGallery(QtWidgets.QFrame):
         self._mainLayout.setSpacing(5)
 
         self._upButton = RibbonGalleryButton(self)
-        self._upButton.setIcon(QtGui.QIcon(DataFile("icons/up.png")))
+        self._upButton.setIcon(DataIcon("icons/up.png", 24))
         self._upButton.setIconSize(QtCore.QSize(24, 24))
         self._upButton.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
         self._upButton.setAutoRaise(True)
         self._downButton = RibbonGalleryButton(self)
-        self._downButton.setIcon(QtGui.QIcon(DataFile("icons/down.png")))
+        self._downButton.setIcon(DataIcon("icons/down.png", 24))
         self._downButton.setIconSize(QtCore.QSize(24, 24))
         self._downButton.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
         self._downButton.setAutoRaise(True)
         self._moreButton = RibbonGalleryButton(self)
-        self._moreButton.setIcon(QtGui.QIcon(DataFile("icons/more.png")))
+        self._moreButton.setIcon(DataIcon("icons/more.png", 24))
         self._moreButton.setIconSize(QtCore.QSize(24, 24))
         self._moreButton.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
         self._moreButton.setAutoRaise(True)
@@ -120,10 +481,15 @@ class RibbonGallery(QtWidgets.QFrame):
         self._mainLayout.addWidget(self._listWidget)
         self._mainLayout.addLayout(self._scrollButtonLayout)
 
+        # the gallery and its popup show the same items
+        self._model = RibbonGalleryModel(self)
+        self._listWidget.setModel(self._model)
+        self._listWidget.clicked.connect(self._itemClicked)  # type: ignore
+
         self._upButton.clicked.connect(self._listWidget.scrollToPreviousRow)  # type: ignore
         self._downButton.clicked.connect(self._listWidget.scrollToNextRow)  # type: ignore
 
-        self._popupWidget = RibbonPopupWidget()  # type: ignore
+        self._popupWidget = RibbonPopupWidget(self)  # type: ignore
         self._popupWidget.setFont(QtWidgets.QApplication.instance().font())  # type: ignore
         self._popupWidget.setWindowFlags(QtCore.Qt.Popup)
         self._popupLayout = QtWidgets.QVBoxLayout(self._popupWidget)
@@ -131,6 +497,8 @@ class RibbonGallery(QtWidgets.QFrame):
         self._popupLayout.setSpacing(2)
 
         self._popupListWidget = RibbonGalleryPopupListWidget()
+        self._popupListWidget.setModel(self._model)
+        self._popupListWidget.clicked.connect(self._popupItemClicked)  # type: ignore
         self._popupLayout.addWidget(self._popupListWidget)
         self._popupLayout.addWidget(RibbonHorizontalSeparator())
 
@@ -152,6 +520,11 @@ class RibbonGallery(QtWidgets.QFrame):
         self._upButton.setFixedSize(height // 4, height // 3)  # type: ignore
         self._downButton.setFixedSize(height // 4, height // 3)  # type: ignore
         self._moreButton.setFixedSize(height // 4, height // 3)  # type: ignore
+        # the icons of the inline items shrink to fit into a single row, the items are centered vertically
+        iconSize = max(min(height - self.fontMetrics().height() - 12, 64), 16)
+        self._listWidget.setIconSize(QtCore.QSize(iconSize, iconSize))
+        itemHeight = iconSize + self.fontMetrics().height() + 12
+        self._listWidget.setSpacing(max((height - itemHeight) // 2, 0))
         super().resizeEvent(a0)
 
     def popupMenu(self) -> RibbonPermanentMenu:
@@ -191,36 +564,38 @@ class RibbonGallery(QtWidgets.QFrame):
         """
         self._popupWindowSize = size
 
-    def setSelectedButton(self):
-        """Set the selected button"""
-        button = self.sender()
-        if isinstance(button, RibbonToolButton):
-            row = self._popupButtons.index(button)
-            self._listWidget.scrollTo(self._listWidget.model().index(row, 0), QtWidgets.QAbstractItemView.EnsureVisible)
-            if self._buttons[row].isCheckable():
-                self._buttons[row].setChecked(not self._buttons[row].isChecked())
+    def model(self) -> RibbonGalleryModel:
+        """Return the model holding the items of the gallery."""
+        return self._model
 
-    def _addWidget(self, widget: QtWidgets.QWidget):
-        """Add a widget to the gallery
+    def item(self, row: int) -> RibbonGalleryItem:
+        """Return the item of a row.
 
-        :param widget: widget to add
+        :param row: row of the item
+        :return: the item
         """
-        item = QtWidgets.QListWidgetItem()
-        item.setSizeHint(widget.sizeHint())
-        self._listWidget.setSpacing((self.height() - item.sizeHint().height()) // 2)
-        self._listWidget.addItem(item)
-        self._listWidget.setItemWidget(item, widget)
+        return self._model.item(row)
+
+    def items(self) -> typing.List[RibbonGalleryItem]:
+        """Return all items of the gallery."""
+        return self._model.items()
 
-    def _addPopupWidget(self, widget: QtWidgets.QWidget):
-        """Add a widget to the popup gallery
+    def setSelectedItem(self, item: RibbonGalleryItem):
+        """Scroll the gallery to an item.
 
-        :param widget: widget to add
+        :param item: the item
         """
-        item = QtWidgets.QListWidgetItem()
-        item.setSizeHint(widget.sizeHint())
-        self._popupListWidget.setSpacing((self.height() - item.sizeHint().height()) // 2)
-        self._popupListWidget.addItem(item)
-        self._popupListWidget.setItemWidget(item, widget)
+        self._listWidget.scrollTo(self._model.index(item.row(), 0), QtWidgets.QAbstractItemView.EnsureVisible)
+
+    def _itemClicked(self, index: QtCore.QModelIndex):
+        self._model.item(index.row()).click()
+
+    def _popupItemClicked(self, index: QtCore.QModelIndex):
+        item = self._model.item(index.row())
+        item.click()
+        self.setSelectedItem(item)
+        if self._popupHideOnClick:
+            self.hidePopupWidget()
 
     def setPopupHideOnClick(self, popupHideOnClick: bool):
         """Set the hide on click flag
@@ -238,7 +613,7 @@ class RibbonGallery(QtWidgets.QFrame):
         tooltip=None,
         statusTip=None,
         checkable=False,
-    ) -> RibbonToolButton:
+    ) -> RibbonGalleryItem:
         """Add a button to the gallery
 
         :param text: text of the button
@@ -248,47 +623,52 @@ class RibbonGallery(QtWidgets.QFrame):
         :param tooltip: tooltip of the button
         :param statusTip: status tip of the button
         :param checkable: checkable flag of the button.
-        :return: the button added
+        :return: the item of the button
         """
-        button = RibbonToolButton(self)
-        popupButton = RibbonToolButton(self._popupWidget)
-        if text is not None:
-            button.setText(text)
-            popupButton.setText(text)
-        if icon is not None:
-            button.setIcon(icon)
-            popupButton.setIcon(icon)
+        item = self._model.addItem(text=text, icon=icon, tooltip=tooltip, statusTip=statusTip, checkable=checkable)
+        self._connectItem(item, slot, shortcut)
+        return item
+
+    def _connectItem(self, item: RibbonGalleryItem, slot, shortcut):
         if slot is not None:
-            button.clicked.connect(slot)  # type: ignore
-            popupButton.clicked.connect(slot)  # type: ignore
+            item.clicked.connect(slot)  # type: ignore
         if shortcut is not None:
-            button.setShortcut(shortcut)
-            popupButton.setShortcut(shortcut)
-        if tooltip is not None:
-            button.setToolTip(tooltip)
-            popupButton.setToolTip(tooltip)
-        if statusTip is not None:
-            button.setStatusTip(statusTip)
-            popupButton.setStatusTip(statusTip)
-        if checkable:
-            button.setCheckable(True)
-            popupButton.setCheckable(True)
-        self._buttons.append(button)
-        self._popupButtons.append(popupButton)
-        button.clicked.connect(lambda checked: popupButton.setChecked(checked))  # type: ignore
-        if self._popupHideOnClick:
-            popupButton.clicked.connect(self.hidePopupWidget)  # type: ignore
-        popupButton.clicked.connect(self.setSelectedButton)  # type: ignore
+            item.setShortcut(shortcut)
 
-        if text is None:
-            button.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
-            popupButton.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
-        else:
-            button.setToolButtonStyle(QtCore.Qt.ToolButtonTextUnderIcon)
-            popupButton.setToolButtonStyle(QtCore.Qt.ToolButtonTextUnderIcon)
-        self._addWidget(button)
-        self._addPopupWidget(popupButton)
-        return button
+    def addThumbnailButton(
+        self,
+        thumbnail: ThumbnailSource,
+        text: str = None,
+        slot=None,
+        shortcut=None,
+        tooltip=None,
+        statusTip=None,
+        checkable=False,
+        thumbnailKey=None,
+    ) -> RibbonGalleryItem:
+        """Add a button whose icon is loaded in the background, a placeholder is shown until it is available.
+
+        :param thumbnail: path of the image or callable returning the image scaled to a given QSize,
+                          the callable is called outside of the GUI thread
+        :param text: text of the button
+        :param slot: slot to call when the button is clicked
+        :param shortcut: shortcut of the button
+        :param tooltip: tooltip of the button
+        :param statusTip: status tip of the button
+        :param checkable: checkable flag of the button
+        :param thumbnailKey: key of the thumbnail in the shared cache, the path or the callable if None
+        :return: the item of the button
+        """
+        item = self._model.addItem(
+            text=text,
+            tooltip=tooltip,
+            statusTip=statusTip,
+            checkable=checkable,
+            thumbnail=thumbnail,
+            thumbnailKey=thumbnailKey,
+        )
+        self._connectItem(item, slot, shortcut)
+        return item
 
     def addToggleButton(
         self,
@@ -298,7 +678,7 @@ class RibbonGallery(QtWidgets.QFrame):
         shortcut=None,
         tooltip=None,
         statusTip=None,
-    ) -> RibbonToolButton:
+    ) -> RibbonGalleryItem:
         """Add a toggle button to the gallery
 
         :param text: text of the button
@@ -307,7 +687,6 @@ class RibbonGallery(QtWidgets.QFrame):
         :param shortcut: shortcut of the button
         :param tooltip: tooltip of the button
         :param statusTip: status tip of the button.
-        :return: the button added
+        :return: the item of the button
         """
-        button = self.addButton(text, icon, slot, shortcut, tooltip, statusTip, True)
-        return button
+        return self.addButton(text, icon, slot, shortcut, tooltip, statusTip, True)
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import typing
+
+from PySide import QtGui
+
+
+def fileSignature(filename: str) -> str:
+    """Return a signature of a file that changes whenever the file is modified.
+
+    :param filename: The path to the file.
+    :return: The signature, empty if the file doesn't exist.
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return ""
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def dataSignature(data: typing.Union[str, bytes]) -> str:
+    """Return a signature of in-memory icon data, e.g. the XPM string of a workbench icon.
+
+    :param data: The icon data.
+    :return: The signature.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.sha1(data).hexdigest()
+
+
+class RibbonIconAtlas(object):
+    """Persistent atlas of pre-rasterized icons of one size and device pixel ratio.
+
+    The atlas file is memory-mapped read-only, the pixels of an icon are handed to Qt as a
+    QImage that refers to the mapped pages instead of a copy, so processes showing the same
+    icons share the memory through the page cache. Every icon is stored with a signature
+    of its source, e.g. :func:`fileSignature`, and rasterized again when the signature changes.
+
+    The file consists of a magic string, the length of a JSON index, the index and the
+    ARGB32 premultiplied pixels of all icons.
+    """
+
+    formatVersion = 1
+    _magic = b"RIBBONATLAS\n"
+    _alignment = 16
+
+    def __init__(self, directory: str, size: int, devicePixelRatio: float = 1.0):
+        """Open the atlas of the given icon size.
+
+        :param directory: The directory the atlas files are stored in.
+        :param size: The logical size of the icons.
+        :param devicePixelRatio: The device pixel ratio the icons are rasterized for.
+        """
+        self._size = size
+        self._devicePixelRatio = devicePixelRatio
+        self._fileName = os.path.join(
+            directory, f"icons-{size}@{devicePixelRatio:g}x.atlas"
+        )
+        #: key -> (signature, offset, width, height, devicePixelRatio)
+        self._index: typing.Dict[str, typing.Tuple[str, int, int, int, float]] = {}
+        #: key -> (signature, image) of icons rasterized in this session
+        self._pending: typing.Dict[str, typing.Tuple[str, QtGui.QImage]] = {}
+        self._data: typing.Optional[mmap.mmap] = None
+        self._dataOffset = 0
+        self.load()
+
+    def size(self) -> int:
+        """Return the logical size of the icons."""
+        return self._size
+
+    def devicePixelRatio(self) -> float:
+        """Return the device pixel ratio the icons are rasterized for."""
+        return self._devicePixelRatio
+
+    def fileName(self) -> str:
+        """Return the path of the atlas file."""
+        return self._fileName
+
+    def load(self):
+        """Map the atlas file, a missing or invalid file results in an empty atlas."""
+        self._index = {}
+        self._data = None
+        try:
+            with open(self._fileName, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty files can't be mapped
+            return
+
+        try:
+            if data[: len(self._magic)] != self._magic:
+                return
+            (headerLength,) = struct.unpack_from("<I", data, len(self._magic))
+            headerOffset = len(self._magic) + 4
+            header = json.loads(bytes(data[headerOffset : headerOffset + headerLength]))
+            if header.get("format") != self.formatVersion:
+                return
+            index = {key: tuple(entry) for key, entry in header["icons"].items()}
+        except (struct.error, ValueError, KeyError, AttributeError):
+            return
+
+        self._index = index
+        self._data = data
+        self._dataOffset = self._align(headerOffset + headerLength)
+
+    def pixmap(
+        self, key: str, signature: str, render: typing.Callable[[], QtGui.QImage]
+    ) -> QtGui.QPixmap:
+        """Return the pixmap of an icon, rasterized by `render` only if the atlas has no up-to-date copy.
+
+        :param key: The key of the icon, unique within the atlas.
+        :param signature: The signature of the icon source.
+        :param render: Callable returning the rasterized icon.
+        :return: The pixmap.
+        """
+        entry = self._index.get(key)
+        if entry is not None and entry[0] == signature and key not in self._pending:
+            return QtGui.QPixmap.fromImage(self._image(entry))
+
+        pending = self._pending.get(key)
+        if pending is not None and pending[0] == signature:
+            image = pending[1]
+        else:
+            image = render().convertToFormat(QtGui.QImage.Format_ARGB32_Premultiplied)
+            self._pending[key] = (signature, image)
+        return QtGui.QPixmap.fromImage(image)
+
+    def isDirty(self) -> bool:
+        """Return whether icons were rasterized that are not stored in the atlas file yet."""
+        return bool(self._pending)
+
+    def save(self):
+        """Write the atlas file including the icons rasterized in this session.
+
+        The file is replaced atomically, processes that mapped the previous file keep their pages.
+        """
+        if not self._pending:
+            return
+
+        entries = []  # key, signature, pixels, width, height, devicePixelRatio
+        for key, (
+            signature,
+            offset,
+            width,
+            height,
+            devicePixelRatio,
+        ) in self._index.items():
+            if key not in self._pending:
+                start = self._dataOffset + offset
+                pixels = self._data[start : start + width * height * 4]
+                entries.append(
+                    (key, signature, pixels, width, height, devicePixelRatio)
+                )
+        for key, (signature, image) in self._pending.items():
+            pixels = bytes(image.constBits())[: image.width() * image.height() * 4]
+            entries.append(
+                (
+                    key,
+                    signature,
+                    pixels,
+                    image.width(),
+                    image.height(),
+                    image.devicePixelRatio(),
+                )
+            )
+
+        icons = {}
+        offset = 0
+        for key, signature, pixels, width, height, devicePixelRatio in entries:
+            icons[key] = (signature, offset, width, height, devicePixelRatio)
+            offset += self._align(len(pixels))
+        header = json.dumps({"format": self.formatVersion, "icons": icons}).encode()
+        headerEnd = len(self._magic) + 4 + len(header)
+
+        os.makedirs(os.path.dirname(self._fileName), exist_ok=True)
+        tmpFileName = f"{self._fileName}.{os.getpid()}.tmp"
+        try:
+            with open(tmpFileName, "wb") as file:
+                file.write(self._magic)
+                file.write(struct.pack("<I", len(header)))
+                file.write(header)
+                file.write(b"\0" * (self._align(headerEnd) - headerEnd))
+                for _, _, pixels, _, _, _ in entries:
+                    file.write(pixels)
+                    file.write(b"\0" * (self._align(len(pixels)) - len(pixels)))
+            os.replace(tmpFileName, self._fileName)
+        except OSError:
+            # e.g. the file is mapped by another process on Windows, try again next time
+            return
+
+        self._pending = {}
+        self.load()
+
+    def _image(self, entry: typing.Tuple[str, int, int, int, float]) -> QtGui.QImage:
+        """Return the image of an index entry, referring to the mapped file."""
+        _, offset, width, height, devicePixelRatio = entry
+        start = self._dataOffset + offset
+        pixels = memoryview(self._data)[start : start + width * height * 4]
+        try:
+            image = QtGui.QImage(
+                pixels,
+                width,
+                height,
+                width * 4,
+                QtGui.QImage.Format_ARGB32_Premultiplied,
+            )
+        except TypeError:
+            # bindings that only accept writable buffers get a copy
+            image = QtGui.QImage(
+                bytes(pixels),
+                width,
+                height,
+                width * 4,
+                QtGui.QImage.Format_ARGB32_Premultiplied,
+            )
+        image.setDevicePixelRatio(devicePixelRatio)
+        return image
+
+    def _align(self, value: int) -> int:
+        return (value + self._alignment - 1) // self._alignment * self._alignment
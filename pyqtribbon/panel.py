@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import contextlib
 import functools
+import math
 import re
-from typing import Any, Callable, Dict, List, Union, overload
+from typing import Any, Callable, Dict, List, Optional, Union, overload
 
-import numpy as np
 from PySide import QtCore, QtGui, QtWidgets
 
-from .constants import ColumnWise, Large, Medium, RibbonButtonStyle, Small
+from .constants import ColumnWise, Large, Medium, RibbonButtonStyle, RibbonPanelSizeLevel, Small
 from .gallery import RibbonGallery
+from .menu import RibbonMenu
 from .separator import RibbonSeparator
 from .toolbutton import RibbonToolButton
-from .utils import DataFile
+from .utils import DataIcon, batchUpdates
 
 
 class RibbonPanelTitle(QtWidgets.QLabel):
@@ -21,7 +23,12 @@ class RibbonPanelTitle(QtWidgets.QLabel):
 
 
 class RibbonGridLayoutManager(object):
-    """Grid Layout Manager."""
+    """Grid Layout Manager.
+
+    The occupied cells of each row are kept as a bitmask, bit `col` is set if the cell is occupied,
+    so a free space is found with a few integer operations per row instead of testing every cell,
+    and adding columns doesn't copy anything.
+    """
 
     def __init__(self, rows: int):
         """Create a new grid layout manager.
@@ -29,7 +36,19 @@ class RibbonGridLayoutManager(object):
         :param rows: The number of rows in the grid layout.
         """
         self.rows = rows
-        self.cells = np.ones((rows, 1), dtype=bool)
+        #: The number of columns in the grid layout.
+        self.columns = 1
+        #: The occupied cells of each row.
+        self.occupied = [0] * rows
+
+    def isFree(self, row: int, col: int) -> bool:
+        """Return whether a cell is free.
+
+        :param row: The row of the cell.
+        :param col: The column of the cell.
+        :return: Whether the cell is free.
+        """
+        return not (self.occupied[row] >> col) & 1
 
     def request_cells(self, rowSpan: int = 1, colSpan: int = 1, mode=ColumnWise):
         """Request a number of available cells from the grid.
@@ -42,52 +61,292 @@ class RibbonGridLayoutManager(object):
         if rowSpan > self.rows:
             raise ValueError("RowSpan is too large")
         if mode == ColumnWise:
-            for row in range(self.cells.shape[0] - rowSpan + 1):
-                for col in range(self.cells.shape[1] - colSpan + 1):
-                    if self.cells[row: row + rowSpan, col: col + colSpan].all():
-                        self.cells[row: row + rowSpan, col: col + colSpan] = False
+            # the first free space is searched row by row
+            lastCol = self.columns - colSpan
+            if lastCol >= 0:
+                candidates = (1 << (lastCol + 1)) - 1  # columns a space could start at
+                for row in range(self.rows - rowSpan + 1):
+                    occupied = 0
+                    for r in range(row, row + rowSpan):
+                        occupied |= self.occupied[r]
+                    # bit col of starts is set if the columns col ... col + colSpan - 1 are free
+                    starts = candidates
+                    for offset in range(colSpan):
+                        starts &= ~(occupied >> offset)
+                    if starts:
+                        col = (starts & -starts).bit_length() - 1
+                        self._occupy(row, rowSpan, col, colSpan)
                         return row, col
         else:
-            for col in range(self.cells.shape[1]):
-                if self.cells[0, col:].all():
-                    if self.cells.shape[1] - col < colSpan:
-                        self.cells = np.append(
-                            self.cells, np.ones((self.rows, colSpan - (self.cells.shape[1] - col)), dtype=bool), axis=1
-                        )
-                    self.cells[0, col:] = False
-                    return 0, col
-        cols = self.cells.shape[1]
+            # the first column from which on the first row is free
+            col = self.occupied[0].bit_length()
+            if col < self.columns:
+                self.columns = max(self.columns, col + colSpan)
+                self.occupied[0] |= ((1 << (self.columns - col)) - 1) << col
+                return 0, col
+        col = self.columns
         colSpan1 = colSpan
-        if self.cells[:, -1].all():
-            cols -= 1
+        if not any((occupied >> (self.columns - 1)) & 1 for occupied in self.occupied):
+            # the last column is still empty, it is used for the new space
+            col -= 1
             colSpan1 -= 1
-        self.cells = np.append(self.cells, np.ones((self.rows, colSpan1), dtype=bool), axis=1)
-        self.cells[:rowSpan, cols: cols + colSpan] = False
-        return 0, cols
+        self.columns += colSpan1
+        self._occupy(0, rowSpan, col, colSpan)
+        return 0, col
 
+    def _occupy(self, row: int, rowSpan: int, col: int, colSpan: int):
+        mask = ((1 << colSpan) - 1) << col
+        for r in range(row, row + rowSpan):
+            self.occupied[r] |= mask
 
-class RibbonPanelItemWidget(QtWidgets.QFrame):
-    """Widget to display a panel item."""
 
-    def __init__(self, parent=None):
-        """Create a new panel item.
+class RibbonPanelLayout(QtWidgets.QLayout):
+    """Layout arranging the widgets of a panel in a grid with a fixed number of rows.
+
+    Every widget spans a number of rows, e.g. 2 for small, 3 for medium and 6 for large buttons, the cells are
+    allocated by a :class:`RibbonGridLayoutManager` when it is added. The rows share the height of the layout,
+    so the widgets follow the panel when it is resized, and the widths of the columns are computed from the size
+    hints of the widgets, which are cached until the layout is invalidated.
+    """
 
+    def __init__(self, rows: int = 6, parent=None):
+        """Create a new panel layout.
+
+        :param rows: The number of rows.
         :param parent: The parent widget.
         """
         super().__init__(parent)
-        self.setLayout(QtWidgets.QVBoxLayout())
-        self.layout().setContentsMargins(0, 0, 0, 0)
-        self.layout().setSpacing(0)
-        self.layout().setAlignment(QtCore.Qt.AlignCenter)
-        self.layout().setSizeConstraint(QtWidgets.QLayout.SetMaximumSize)
-        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)  # type: ignore
+        self._gridLayoutManager = RibbonGridLayoutManager(rows)
+        #: (item, row, col, rowSpan, colSpan, mode, fixedHeight, verticalAlignment) of the items in the layout
+        self._items = []
+        #: the placement of the widget being added by :meth:`addWidget`
+        self._placement = None
+        self._hintsValid = False
+        #: x offsets of the columns at their preferred and minimum widths, followed by the end of the grid plus spacing
+        self._columnOffsets = [0]
+        self._minimumColumnOffsets = [0]
+        self._sizeHint = QtCore.QSize(0, 0)
+        self._minimumSize = QtCore.QSize(0, 0)
+        self._expandingDirections = QtCore.Qt.Orientation(0)
+
+    def gridLayoutManager(self) -> RibbonGridLayoutManager:
+        """Return the grid layout manager allocating the cells of the widgets."""
+        return self._gridLayoutManager
+
+    def rows(self) -> int:
+        """Return the number of rows."""
+        return self._gridLayoutManager.rows
+
+    def rowHeight(self, height: int = None) -> float:
+        """Return the height of a row.
+
+        :param height: The height of the layout, the height of its geometry if None.
+        :return: The height of a row.
+        """
+        margins = self.contentsMargins()
+        if height is None:
+            height = self.geometry().height()
+        rows = self.rows()
+        return (height - margins.top() - margins.bottom() - max(self.spacing(), 0) * (rows - 1)) / rows
 
-    def addWidget(self, widget):
-        """Add a widget to the panel item.
+    def addWidget(
+        self,
+        widget: QtWidgets.QWidget,
+        rowSpan: int = 1,
+        colSpan: int = 1,
+        mode=ColumnWise,
+        alignment=QtCore.Qt.AlignCenter,
+        fixedHeight: Union[bool, float] = False,
+    ):
+        """Add a widget to the first free cells.
 
         :param widget: The widget to add.
+        :param rowSpan: The number of rows the widget spans.
+        :param colSpan: The number of columns the widget spans.
+        :param mode: The mode to find free cells.
+        :param alignment: The alignment of the widget in its cells.
+        :param fixedHeight: Whether the height of the widget is fixed, see :meth:`RibbonPanel.addWidget`.
+        :return: row, col, the first cell of the widget.
         """
-        self.layout().addWidget(widget)
+        row, col = self._gridLayoutManager.request_cells(rowSpan, colSpan, mode)
+        self._placement = (row, col, rowSpan, colSpan, mode, alignment, fixedHeight)
+        try:
+            super().addWidget(widget)  # creates the item of the widget and passes it to addItem()
+        finally:
+            self._placement = None
+        return row, col
+
+    def addItem(self, item: QtWidgets.QLayoutItem):
+        """Add an item, items that are not added by :meth:`addWidget` take a single cell.
+
+        :param item: The item to add.
+        """
+        if self._placement is not None:
+            row, col, rowSpan, colSpan, mode, alignment, fixedHeight = self._placement
+        else:
+            row, col = self._gridLayoutManager.request_cells(1, 1, ColumnWise)
+            rowSpan, colSpan, mode, alignment, fixedHeight = 1, 1, ColumnWise, item.alignment(), False
+        verticalAlignment = alignment & QtCore.Qt.AlignVertical_Mask
+        if fixedHeight is True or fixedHeight > 0:
+            # the layout sets the height, the item only aligns the widget horizontally
+            alignment = alignment & QtCore.Qt.AlignHorizontal_Mask
+        else:
+            fixedHeight = False
+        item.setAlignment(alignment)
+        self._items.append((item, row, col, rowSpan, colSpan, mode, fixedHeight, verticalAlignment))
+        self.invalidate()
+
+    def rowSpan(self, index: int) -> int:
+        """Return the number of rows an item spans.
+
+        :param index: The index of the item.
+        :return: The number of rows.
+        """
+        return self._items[index][3]
+
+    def setRowSpans(self, rowSpans: List[int]):
+        """Change the number of rows the items span, the cells are allocated again in the order of the items.
+
+        :param rowSpans: The numbers of rows, one for every item.
+        """
+        self._gridLayoutManager = RibbonGridLayoutManager(self.rows())
+        items = []
+        for (item, _, _, _, colSpan, mode, fixedHeight, verticalAlignment), rowSpan in zip(self._items, rowSpans):
+            row, col = self._gridLayoutManager.request_cells(rowSpan, colSpan, mode)
+            items.append((item, row, col, rowSpan, colSpan, mode, fixedHeight, verticalAlignment))
+        self._items = items
+        self.invalidate()
+
+    def count(self) -> int:
+        return len(self._items)
+
+    def itemAt(self, index: int) -> Optional[QtWidgets.QLayoutItem]:
+        return self._items[index][0] if 0 <= index < len(self._items) else None
+
+    def takeAt(self, index: int) -> Optional[QtWidgets.QLayoutItem]:
+        # the cells of the item stay allocated, like the cells of a removed item of a QGridLayout
+        if 0 <= index < len(self._items):
+            item = self._items.pop(index)[0]
+            self.invalidate()
+            return item
+        return None
+
+    def invalidate(self):
+        self._hintsValid = False
+        super().invalidate()
+
+    def expandingDirections(self) -> QtCore.Qt.Orientations:
+        self._updateHints()
+        return self._expandingDirections
+
+    def sizeHint(self) -> QtCore.QSize:
+        self._updateHints()
+        return self._sizeHint
+
+    def minimumSize(self) -> QtCore.QSize:
+        self._updateHints()
+        return self._minimumSize
+
+    def setGeometry(self, rect: QtCore.QRect):
+        super().setGeometry(rect)
+        self._updateHints()
+        margins = self.contentsMargins()
+        left = rect.x() + margins.left()
+        top = rect.y() + margins.top()
+        width = rect.width() - margins.left() - margins.right()
+        height = rect.height() - margins.top() - margins.bottom()
+        spacing = max(self.spacing(), 0)
+        offsets = self._columnOffsets
+        columns = len(offsets) - 1
+        # the width exceeding the size hint is shared by the columns
+        extra = max(width - offsets[-1] + spacing, 0)
+        # the rows share the height, a row starts every rowPitch pixels
+        rowPitch = (height + spacing) / self.rows()
+        for item, row, col, rowSpan, colSpan, _, fixedHeight, verticalAlignment in self._items:
+            if item.isEmpty():
+                continue
+            x = left + offsets[col] + extra * col // columns
+            cellWidth = left + offsets[col + colSpan] - spacing + extra * (col + colSpan) // columns - x
+            y = top + round(row * rowPitch)
+            cellHeight = top + round((row + rowSpan) * rowPitch) - spacing - y
+            if fixedHeight:
+                itemHeight = self._fixedHeight(fixedHeight, cellHeight)
+                if verticalAlignment & QtCore.Qt.AlignBottom:
+                    y += cellHeight - itemHeight
+                elif not verticalAlignment & QtCore.Qt.AlignTop:
+                    y += (cellHeight - itemHeight) // 2
+                cellHeight = itemHeight
+            item.setGeometry(QtCore.QRect(x, y, cellWidth, cellHeight))
+
+    @staticmethod
+    def _fixedHeight(fixedHeight: Union[bool, float], cellHeight: int) -> int:
+        height = (
+            int(fixedHeight * cellHeight)
+            if 0 < fixedHeight <= 1
+            else fixedHeight
+            if 1 < fixedHeight < cellHeight
+            else cellHeight
+        )
+        return int(max(height, 0.4 * cellHeight))  # minimum height is 40% of the cell height
+
+    def _updateHints(self):
+        if self._hintsValid:
+            return
+        spacing = max(self.spacing(), 0)
+        columns = self._gridLayoutManager.columns
+        widths = [0] * columns
+        minimumWidths = [0] * columns
+        spanned = []
+        rowHeight = minimumRowHeight = 0
+        expandingDirections = QtCore.Qt.Orientation(0)
+        for item, row, col, rowSpan, colSpan, _, fixedHeight, _ in self._items:
+            if item.isEmpty():
+                continue
+            hint = item.sizeHint()
+            minimum = item.minimumSize()
+            expandingDirections |= item.expandingDirections()
+            if colSpan == 1:
+                widths[col] = max(widths[col], hint.width())
+                minimumWidths[col] = max(minimumWidths[col], minimum.width())
+            else:
+                spanned.append((col, colSpan, hint.width(), minimum.width()))
+            if not fixedHeight:
+                # widgets with a fixed height follow the rows
+                rowHeight = max(rowHeight, math.ceil((hint.height() - spacing * (rowSpan - 1)) / rowSpan))
+                minimumRowHeight = max(
+                    minimumRowHeight, math.ceil((minimum.height() - spacing * (rowSpan - 1)) / rowSpan)
+                )
+        for col, colSpan, width, minimumWidth in spanned:
+            self._spanWidth(widths, col, colSpan, width, spacing)
+            self._spanWidth(minimumWidths, col, colSpan, minimumWidth, spacing)
+        self._columnOffsets = self._offsets(widths, spacing)
+        self._minimumColumnOffsets = self._offsets(minimumWidths, spacing)
+        margins = self.contentsMargins()
+        horizontalMargins = margins.left() + margins.right()
+        verticalMargins = margins.top() + margins.bottom() + spacing * (self.rows() - 1)
+        self._sizeHint = QtCore.QSize(
+            self._columnOffsets[-1] - spacing + horizontalMargins, rowHeight * self.rows() + verticalMargins
+        )
+        self._minimumSize = QtCore.QSize(
+            self._minimumColumnOffsets[-1] - spacing + horizontalMargins,
+            minimumRowHeight * self.rows() + verticalMargins,
+        )
+        self._expandingDirections = expandingDirections
+        self._hintsValid = True
+
+    @staticmethod
+    def _spanWidth(widths: List[int], col: int, colSpan: int, width: int, spacing: int):
+        # the width missing for an item spanning several columns is shared by these columns
+        missing = width - sum(widths[col : col + colSpan]) - spacing * (colSpan - 1)
+        for i in range(colSpan if missing > 0 else 0):
+            widths[col + i] += missing // colSpan + (1 if i < missing % colSpan else 0)
+
+    @staticmethod
+    def _offsets(widths: List[int], spacing: int) -> List[int]:
+        offsets = [0]
+        for width in widths:
+            offsets.append(offsets[-1] + width + spacing)
+        return offsets
 
 
 class RibbonPanelOptionButton(QtWidgets.QToolButton):
@@ -113,7 +372,11 @@ class RibbonPanel(QtWidgets.QFrame):
     _showPanelOptionButton: bool
 
     #: widgets that are added to the panel
-    _widgets: List[QtWidgets.QWidget] = []
+    _widgets: List[QtWidgets.QWidget]
+    #: exit stack of the open :meth:`batchUpdate` block, None outside of it
+    _batchStack: Optional[contextlib.ExitStack] = None
+    #: size level of the panel
+    _sizeLevel: RibbonPanelSizeLevel = RibbonPanelSizeLevel.Full
 
     # height of the title widget
     _titleHeight: int = 20
@@ -152,8 +415,17 @@ class RibbonPanel(QtWidgets.QFrame):
         self._largeRows = maxRows
         self._mediumRows = max(round(maxRows / 2), 1)
         self._smallRows = max(round(maxRows / 3), 1)
-        self._gridLayoutManager = RibbonGridLayoutManager(self._maxRows)
         self._widgets = []
+        #: widgets waiting to be added to the actions layout at the end of :meth:`batchUpdate`
+        self._pendingItems = []
+        #: button -> (row span, button style, tool button style) the button was added with
+        self._buttonStyles = {}
+        #: widths of the panel at its size levels, None until they are measured
+        self._levelWidths = None
+        #: button showing the collapsed panel, created when the panel is collapsed the first time
+        self._collapsedButton = None
+        #: widgets hidden while the panel is collapsed
+        self._collapsedWidgets = []
         self._showPanelOptionButton = showPanelOptionButton
 
         # Main layout
@@ -162,10 +434,11 @@ class RibbonPanel(QtWidgets.QFrame):
         self._mainLayout.setSpacing(5)
 
         # Actions layout
-        self._actionsLayout = QtWidgets.QGridLayout()
+        self._actionsLayout = RibbonPanelLayout(self._maxRows)
         self._actionsLayout.setContentsMargins(5, 0, 5, 0)
         self._actionsLayout.setSpacing(0)
         self._mainLayout.addLayout(self._actionsLayout, 1)
+        self._gridLayoutManager = self._actionsLayout.gridLayoutManager()
 
         # Title layout
         self._titleWidget = QtWidgets.QWidget()
@@ -182,7 +455,7 @@ class RibbonPanel(QtWidgets.QFrame):
         if showPanelOptionButton:
             self._panelOption = RibbonPanelOptionButton()  # type: ignore
             self._panelOption.setAutoRaise(True)
-            self._panelOption.setIcon(QtGui.QIcon(DataFile("icons/linking.png")))
+            self._panelOption.setIcon(DataIcon("icons/linking.png", 16))
             self._panelOption.setIconSize(QtCore.QSize(16, 16))
             self._panelOption.setToolTip("Panel options")
             self._panelOption.clicked.connect(self.panelOptionClicked)  # type: ignore
@@ -286,19 +559,169 @@ class RibbonPanel(QtWidgets.QFrame):
     def rowHeight(self) -> int:
         """Return the height of a row."""
         return int(
-            (
+            self._actionsLayout.rowHeight(
                 self.size().height()
                 - self._mainLayout.contentsMargins().top()
                 - self._mainLayout.contentsMargins().bottom()
                 - self._mainLayout.spacing()
                 - self._titleWidget.height()
-                - self._actionsLayout.contentsMargins().top()
-                - self._actionsLayout.contentsMargins().bottom()
-                - self._actionsLayout.verticalSpacing() * (self._gridLayoutManager.rows - 1)
             )
-            / self._gridLayoutManager.rows
         )
 
+    def sizeLevel(self) -> RibbonPanelSizeLevel:
+        """Return the size level of the panel.
+
+        :return: The size level.
+        """
+        return self._sizeLevel
+
+    def sizeLevels(self) -> List[RibbonPanelSizeLevel]:
+        """Return the size levels of the panel, only panels with nothing but buttons and separators can collapse.
+
+        :return: The size levels, from the widest one on.
+        """
+        levels = [RibbonPanelSizeLevel.Full, RibbonPanelSizeLevel.Reduced, RibbonPanelSizeLevel.Compact]
+        if self._buttonStyles and all(
+            isinstance(widget, (QtWidgets.QToolButton, RibbonSeparator)) for widget in self._widgets
+        ):
+            levels.append(RibbonPanelSizeLevel.Collapsed)
+        return levels
+
+    def setSizeLevel(self, level: RibbonPanelSizeLevel):
+        """Set the size level of the panel.
+
+        :param level: The size level.
+        """
+        level = RibbonPanelSizeLevel(level)
+        if level == self._sizeLevel:
+            return
+        self._flushPendingItems()
+        if level != RibbonPanelSizeLevel.Collapsed:
+            self._setButtonSizes(level)
+        self._setCollapsed(level == RibbonPanelSizeLevel.Collapsed)
+        self._sizeLevel = level
+        self._mainLayout.invalidate()
+        self.updateGeometry()
+
+    def levelWidths(self) -> List[int]:
+        """Return the widths of the panel at its size levels.
+
+        The widths are measured by applying the levels once, they are cached until widgets are added.
+
+        :return: The widths, one for each of :meth:`sizeLevels`.
+        """
+        if self._levelWidths is None:
+            self._flushPendingItems()
+            self.ensurePolished()
+            level = self._sizeLevel
+            updatesEnabled = self.updatesEnabled()
+            self.setUpdatesEnabled(False)
+            try:
+                with RibbonToolButton.deferredPolish():
+                    widths = []
+                    for trialLevel in self.sizeLevels():
+                        self.setSizeLevel(trialLevel)
+                        widths.append(self.sizeHint().width())
+                    self.setSizeLevel(level)
+            finally:
+                self.setUpdatesEnabled(updatesEnabled)
+            self._levelWidths = widths
+        return self._levelWidths
+
+    def _setButtonSizes(self, level: RibbonPanelSizeLevel):
+        # buttons larger than the level allows are shown at the largest style of the level and span its rows
+        largestStyle = RibbonButtonStyle(Large - min(level, RibbonPanelSizeLevel.Compact))
+        rowSpans = []
+        for index in range(self._actionsLayout.count()):
+            widget = self._actionsLayout.itemAt(index).widget()
+            rowSpan = self._actionsLayout.rowSpan(index)
+            if widget in self._buttonStyles:
+                rowSpan, style, toolButtonStyle = self._buttonStyles[widget]
+                if style > largestStyle:
+                    style = largestStyle
+                    rowSpan = self.defaultRowSpan(style)
+                widget.setButtonStyle(style)
+                if toolButtonStyle == QtCore.Qt.ToolButtonIconOnly:
+                    widget.setToolButtonStyle(toolButtonStyle)
+            rowSpans.append(rowSpan)
+        self._actionsLayout.setRowSpans(rowSpans)
+        self._gridLayoutManager = self._actionsLayout.gridLayoutManager()
+
+    def _setCollapsed(self, collapsed: bool):
+        if collapsed == bool(self._collapsedWidgets):
+            return
+        if collapsed:
+            button = self.collapsedButton()
+            self._collapsedWidgets = [self._titleWidget] + [
+                widget for widget in self._widgets if not widget.isHidden()
+            ]
+            for widget in self._collapsedWidgets:
+                widget.hide()
+            button.show()
+        else:
+            self._collapsedButton.hide()
+            for widget in self._collapsedWidgets:
+                widget.show()
+            self._collapsedWidgets = []
+        self._actionsLayout.invalidate()
+
+    def collapsedButton(self) -> RibbonToolButton:
+        """Return the button that shows the panel when it is collapsed, its menu holds the buttons of the panel.
+
+        :return: The button.
+        """
+        if self._collapsedButton is None:
+            button = RibbonToolButton(self)
+            button.setButtonStyle(Large)
+            button.setText(self.title())
+            icons = (widget.icon() for widget in self._buttonStyles if not widget.icon().isNull())
+            button.setIcon(next(icons, QtGui.QIcon()))
+            button.setPopupMode(QtWidgets.QToolButton.InstantPopup)
+            menu = RibbonMenu(button)
+            menu.aboutToShow.connect(self._fillCollapsedMenu)  # type: ignore
+            button.setMenu(menu)
+            button.hide()
+            self._mainLayout.insertWidget(0, button, 1, QtCore.Qt.AlignCenter)
+            self._collapsedButton = button
+        return self._collapsedButton
+
+    def _fillCollapsedMenu(self):
+        menu = self._collapsedButton.menu()
+        menu.clear()
+        for index in range(self._actionsLayout.count()):
+            widget = self._actionsLayout.itemAt(index).widget()
+            if isinstance(widget, RibbonSeparator):
+                menu.addSeparator()
+            elif isinstance(widget, QtWidgets.QToolButton):
+                action = widget.defaultAction()
+                if action is None:
+                    # the action stands in for the button, it is deleted with the next clear() of the menu
+                    action = menu.addAction(widget.icon(), widget.text())
+                    action.setCheckable(widget.isCheckable())
+                    action.setChecked(widget.isChecked())
+                    action.setEnabled(widget.isEnabled())
+                    action.triggered.connect(widget.click)  # type: ignore
+                else:
+                    menu.addAction(action)
+
+    @contextlib.contextmanager
+    def batchUpdate(self):
+        """Add many widgets at once, the panel is laid out and its buttons are repolished once at the end.
+
+        Updates of the panel are suspended and the widgets are added to the layout when the outermost block ends::
+
+            with panel.batchUpdate():
+                for ...:
+                    panel.addSmallButton(...)
+        """
+        with RibbonToolButton.deferredPolish(), batchUpdates(self, self._flushPendingItems):
+            yield self
+
+    def _flushPendingItems(self):
+        items, self._pendingItems = self._pendingItems, []
+        for widget, kwargs in items:
+            self._actionsLayout.addWidget(widget, **kwargs)
+
     def addWidgetsBy(self, data: Dict[str, Dict]) -> Dict[str, QtWidgets.QWidget]:
         """Add widgets to the panel.
 
@@ -324,12 +747,13 @@ class RibbonPanel(QtWidgets.QFrame):
         :return: A dictionary of the added widgets.
         """
         widgets = {}  # type: Dict[str, QtWidgets.QWidget]
-        for key, widget_data in data.items():
-            type = widget_data.pop("type", "").capitalize()
-            if hasattr(self, "add" + type):
-                method = getattr(self, "add" + type)  # type: Callable
-                if method is not None:
-                    widgets[key] = method(**widget_data.get("arguments", {}))
+        with self.batchUpdate():
+            for key, widget_data in data.items():
+                type = widget_data.pop("type", "").capitalize()
+                if hasattr(self, "add" + type):
+                    method = getattr(self, "add" + type)  # type: Callable
+                    if method is not None:
+                        widgets[key] = method(**widget_data.get("arguments", {}))
         return widgets
 
     def addWidget(
@@ -353,27 +777,25 @@ class RibbonPanel(QtWidgets.QFrame):
                             height, when a boolean is given, the height is fixed to the maximum height allowed if the
                             value is True, when a percentage is given (0 < percentage < 1) the height is calculated
                             from the height of the maximum height allowed, depends on the number of rows to span. The
-                            minimum height is 40% of the maximum height allowed.
+                            minimum height is 40% of the maximum height allowed. The height is kept up to date by the
+                            layout of the panel when the panel is resized.
         :return: The added widget.
         """
-        rowSpan = self.defaultRowSpan(rowSpan)
+        kwargs = dict(
+            rowSpan=self.defaultRowSpan(rowSpan),
+            colSpan=colSpan,
+            mode=mode,
+            alignment=alignment,
+            fixedHeight=fixedHeight,
+        )
         self._widgets.append(widget)
-        row, col = self._gridLayoutManager.request_cells(rowSpan, colSpan, mode)
-        maximumHeight = self.rowHeight() * rowSpan + self._actionsLayout.verticalSpacing() * (rowSpan - 2)
-        widget.setMaximumHeight(maximumHeight)
-        if fixedHeight is True or fixedHeight > 0:
-            fixedHeight = (
-                int(fixedHeight * maximumHeight)
-                if 0 < fixedHeight <= 1
-                else fixedHeight
-                if 1 < fixedHeight < maximumHeight
-                else maximumHeight
-            )
-            fixedHeight = max(fixedHeight, 0.4 * maximumHeight)  # minimum height is 40% of the maximum height
-            widget.setFixedHeight(fixedHeight)
-        item = RibbonPanelItemWidget(self)
-        item.addWidget(widget)
-        self._actionsLayout.addWidget(item, row, col, rowSpan, colSpan, alignment)  # type: ignore
+        if isinstance(widget, RibbonToolButton):
+            self._buttonStyles[widget] = (kwargs["rowSpan"], widget.buttonStyle(), widget.toolButtonStyle())
+        self._levelWidths = None
+        if self._batchStack is not None:
+            self._pendingItems.append((widget, kwargs))
+        else:
+            self._actionsLayout.addWidget(widget, **kwargs)
         return widget
 
     addSmallWidget = functools.partialmethod(addWidget, rowSpan=Small)
@@ -381,8 +803,24 @@ class RibbonPanel(QtWidgets.QFrame):
     addLargeWidget = functools.partialmethod(addWidget, rowSpan=Large)
 
     def removeWidget(self, widget: QtWidgets.QWidget):
-        """Remove a widget from the panel."""
+        """Remove a widget from the panel, the remaining widgets close the gap in the order they were added.
+
+        :param widget: The widget to remove.
+        """
+        self._flushPendingItems()
+        index = self._actionsLayout.indexOf(widget)
+        if index < 0:
+            return
         self._actionsLayout.removeWidget(widget)
+        rowSpans = [self._actionsLayout.rowSpan(i) for i in range(self._actionsLayout.count())]
+        self._actionsLayout.setRowSpans(rowSpans)
+        self._gridLayoutManager = self._actionsLayout.gridLayoutManager()
+        if widget in self._widgets:
+            self._widgets.remove(widget)
+        if widget in self._collapsedWidgets:
+            self._collapsedWidgets.remove(widget)
+        self._buttonStyles.pop(widget, None)
+        self._levelWidths = None
 
     def widget(self, index: int) -> QtWidgets.QWidget:
         """Get the widget at the given index.
@@ -438,18 +876,19 @@ class RibbonPanel(QtWidgets.QFrame):
         button.setShortcut(shortcut) if shortcut else None
         button.setToolTip(tooltip) if tooltip else None
         button.setStatusTip(statusTip) if statusTip else None
-        maximumHeight = (
-            self.height()
-            - self._titleLabel.sizeHint().height()
-            - self._mainLayout.spacing()
-            - self._mainLayout.contentsMargins().top()
-            - self._mainLayout.contentsMargins().bottom()
-        )
-        button.setMaximumHeight(maximumHeight)
+        # the height of the button is set by the panel layout, only the icon of large buttons is limited to the
+        # height the panel offers for its widgets
         if style == Large:
+            availableHeight = (
+                self.height()
+                - self._titleLabel.sizeHint().height()
+                - self._mainLayout.spacing()
+                - self._mainLayout.contentsMargins().top()
+                - self._mainLayout.contentsMargins().bottom()
+            )
             fontSize = max(button.font().pointSize() * 4 / 3, button.font().pixelSize())
             arrowSize = fontSize
-            maximumIconSize = max(maximumHeight - fontSize * 2 - arrowSize, 48)
+            maximumIconSize = max(availableHeight - fontSize * 2 - arrowSize, 48)
             button.setMaximumIconSize(int(maximumIconSize))
         if not showText:
             button.setToolButtonStyle(QtCore.Qt.ToolButtonIconOnly)
@@ -556,10 +995,8 @@ class RibbonPanel(QtWidgets.QFrame):
         :return: The gallery.
         """
         kwargs["rowSpan"] = Large if "rowSpan" not in kwargs else kwargs["rowSpan"]
-        rowSpan = self.defaultRowSpan(kwargs["rowSpan"])
+        kwargs.setdefault("fixedHeight", True)  # the gallery fills its rows
         gallery = RibbonGallery(minimumWidth, popupHideOnClick, self)
-        maximumHeight = self.rowHeight() * rowSpan + self._actionsLayout.verticalSpacing() * (rowSpan - 2)
-        gallery.setFixedHeight(maximumHeight)
         return self.addWidget(gallery, **kwargs)
 
     def setTitle(self, title: str):
@@ -568,6 +1005,9 @@ class RibbonPanel(QtWidgets.QFrame):
         :param title: The title to set.
         """
         self._titleLabel.setText(title)
+        if self._collapsedButton is not None:
+            self._collapsedButton.setText(title)
+        self._levelWidths = None
 
     def title(self):
         """Get the title of the panel.
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Iterable, List, Union, overload
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple, Union, overload
 
-import numpy as np
 from PySide import QtCore, QtGui, QtWidgets
 
-from .constants import ColumnWise, Large, RibbonButtonStyle, Small
+from .constants import ColumnWise, Large, RibbonButtonStyle, RibbonPanelSizeLevel, Small
 from .gallery import RibbonGallery
 from .separator import RibbonSeparator
 from .toolbutton import RibbonToolButton
@@ -17,16 +16,39 @@ class RibbonPanelTitle(QtWidgets.QLabel):
 
 class RibbonGridLayoutManager(object):
     rows: int
-    cells: np.ndarray
+    columns: int
+    occupied: List[int]
 
     def __init__(self, rows: int): ...
+    def isFree(self, row: int, col: int) -> bool: ...
     def request_cells(self, rowSpan: int = 1, colSpan: int = 1, mode=ColumnWise): ...
 
 
-class RibbonPanelItemWidget(QtWidgets.QFrame):
-    def __init__(self, parent=None): ...
-    def addWidget(self, widget): ...
-
+class RibbonPanelLayout(QtWidgets.QLayout):
+    def __init__(self, rows: int = 6, parent=None): ...
+    def gridLayoutManager(self) -> RibbonGridLayoutManager: ...
+    def rows(self) -> int: ...
+    def rowHeight(self, height: int = None) -> float: ...
+    def addWidget(
+        self,
+        widget: QtWidgets.QWidget,
+        rowSpan: int = 1,
+        colSpan: int = 1,
+        mode=ColumnWise,
+        alignment=QtCore.Qt.AlignCenter,
+        fixedHeight: Union[bool, float] = False,
+    ) -> Tuple[int, int]: ...
+    def addItem(self, item: QtWidgets.QLayoutItem): ...
+    def rowSpan(self, index: int) -> int: ...
+    def setRowSpans(self, rowSpans: List[int]): ...
+    def count(self) -> int: ...
+    def itemAt(self, index: int) -> Optional[QtWidgets.QLayoutItem]: ...
+    def takeAt(self, index: int) -> Optional[QtWidgets.QLayoutItem]: ...
+    def invalidate(self): ...
+    def expandingDirections(self) -> QtCore.Qt.Orientations: ...
+    def sizeHint(self) -> QtCore.QSize: ...
+    def minimumSize(self) -> QtCore.QSize: ...
+    def setGeometry(self, rect: QtCore.QRect): ...
 
 class RibbonPanelOptionButton(QtWidgets.QToolButton):
     ...
@@ -40,7 +62,7 @@ class RibbonPanel(QtWidgets.QFrame):
     _gridLayoutManager: RibbonGridLayoutManager
     _showPanelOptionButton: bool
 
-    _widgets: List[QtWidgets.QWidget] = []
+    _widgets: List[QtWidgets.QWidget]
 
     _titleHeight: int = 20
 
@@ -70,6 +92,12 @@ class RibbonPanel(QtWidgets.QFrame):
     def panelOptionButton(self) -> RibbonPanelOptionButton: ...
     def setPanelOptionToolTip(self, text: str): ...
     def rowHeight(self) -> int: ...
+    def sizeLevel(self) -> RibbonPanelSizeLevel: ...
+    def sizeLevels(self) -> List[RibbonPanelSizeLevel]: ...
+    def setSizeLevel(self, level: RibbonPanelSizeLevel): ...
+    def levelWidths(self) -> List[int]: ...
+    def collapsedButton(self) -> RibbonToolButton: ...
+    def batchUpdate(self) -> ContextManager[RibbonPanel]: ...
     def addWidgetsBy(self, data: Dict[str, Dict]) -> Dict[str, QtWidgets.QWidget]: ...
 
     def addWidget(
@@ -541,7 +569,7 @@ class RibbonPanel(QtWidgets.QFrame):
         colSpan: int = 1,
         mode=ColumnWise,
         alignment=QtCore.Qt.AlignCenter,
-        fixedHeight: Union[bool, float] = False,
+        fixedHeight: Union[bool, float] = True,
     ) -> RibbonGallery: ...
     addSmallGallery = addGallery
     addMediumGallery = addGallery
@@ -1,3 +1,4 @@
+import contextlib
 import typing
 
 from PySide import QtCore, QtGui, QtWidgets
@@ -11,9 +12,10 @@ from .category import (
 from .constants import RibbonCategoryStyle, RibbonStyle, contextColors
 from .menu import RibbonMenu
 from .tabbar import RibbonTabBar
+from .theme import repolish, ribbonStyleSheet, theme, themeProperty
 from .titlewidget import RibbonApplicationButton, RibbonTitleWidget
 from .toolbutton import RibbonToolButton
-from .utils import DataFile
+from .utils import DataIcon, batchUpdates
 
 
 class RibbonStackedWidget(QtWidgets.QStackedWidget):
@@ -40,7 +42,9 @@ class RibbonBar(QtWidgets.QMenuBar):
     _autoHideRibbon = False
 
     #: The categories of the ribbon.
-    _categories: typing.Dict[str, RibbonCategory] = {}
+    _categories: typing.Dict[str, RibbonCategory]
+    #: The categories that only exist as a tab and are created on first use.
+    _lazyCategories: typing.Dict[str, typing.Tuple[RibbonCategoryStyle, typing.Optional[QtGui.QColor]]]
     _contextCategoryCount = 0
 
     #: Maximum rows
@@ -55,6 +59,11 @@ class RibbonBar(QtWidgets.QMenuBar):
     #: current tab index
     _currentTabIndex = 0
 
+    #: The style of the ribbon, None until it is set.
+    _ribbonStyle: typing.Optional[RibbonStyle] = None
+    #: exit stack of the open :meth:`batchUpdate` block, None outside of it
+    _batchStack: typing.Optional[contextlib.ExitStack] = None
+
     @typing.overload
     def __init__(self, title: str = "Ribbon Bar Title", maxRows=6, iconSize=32, parent=None):
         pass
@@ -84,6 +93,7 @@ class RibbonBar(QtWidgets.QMenuBar):
             parent = args[1] if len(args) > 1 else kwargs.get("parent", None)
         super().__init__(parent)
         self._categories = {}
+        self._lazyCategories = {}
         self._maxRows = maxRows
         self._ribbonHeight = 180-(32-iconSize)*3
         self.setFixedHeight(self._ribbonHeight)
@@ -170,12 +180,25 @@ class RibbonBar(QtWidgets.QMenuBar):
     def setRibbonStyle(self, style: RibbonStyle):
         """Set the style of the ribbon.
 
+        The style sheet holding the rules of all styles is set once, a style is then selected by the
+        `ribbonTheme` property and only the widgets styled differently by the new style are repolished.
+
         :param style: The style to set.
         """
-        self.setStyleSheet(
-            open(DataFile("styles/base.qss"), "r").read()
-            + open(DataFile(f"styles/{style.name.lower()}.qss"), "r").read()
-        )
+        previousStyle = self._ribbonStyle
+        self._ribbonStyle = style
+        self.setProperty(themeProperty, theme(style).name())
+        if previousStyle is None:
+            self.setStyleSheet(ribbonStyleSheet())
+        elif previousStyle != style:
+            repolish(self, theme(previousStyle).changedClasses(theme(style)))
+
+    def ribbonStyle(self) -> RibbonStyle:
+        """Return the style of the ribbon.
+
+        :return: The style of the ribbon.
+        """
+        return self._ribbonStyle
 
     def applicationOptionButton(self) -> RibbonApplicationButton:
         """Return the application button."""
@@ -251,6 +274,17 @@ class RibbonBar(QtWidgets.QMenuBar):
         button.setAutoRaise(True)
         self._titleWidget.quickAccessToolBar().addWidget(button)
 
+    def removeQuickAccessButton(self, button: QtWidgets.QToolButton):
+        """Remove a button from the quick access bar.
+
+        :param button: The button to remove.
+        """
+        toolBar = self._titleWidget.quickAccessToolBar()
+        for action in toolBar.actions():
+            if toolBar.widgetForAction(action) is button:
+                toolBar.removeAction(action)
+                break
+
     def setQuickAccessButtonHeight(self, height: int = 30):
         """Set the height of the quick access buttons.
 
@@ -336,15 +370,32 @@ class RibbonBar(QtWidgets.QMenuBar):
         :param name: The name of the category.
         :return: The category with the given name.
         """
+        if name in self._lazyCategories:
+            return self._materializeCategory(name)
         return self._categories[name]
 
     def categories(self) -> typing.Dict[str, RibbonCategory]:
-        """Return a list of categories of the ribbon.
+        """Return a list of categories of the ribbon, lazy categories that have not been shown yet are not included.
 
         :return: A dict of categories of the ribbon.
         """
         return self._categories
 
+    @contextlib.contextmanager
+    def batchUpdate(self):
+        """Build many categories, panels and widgets at once.
+
+        Updates of the ribbon are suspended until the outermost block ends, categories created in the block
+        are batched until its end as well, see :meth:`RibbonCategory.batchUpdate`::
+
+            with ribbon.batchUpdate():
+                category = ribbon.addCategory("Category")
+                panel = category.addPanel("Panel")
+                panel.addLargeButton(...)
+        """
+        with RibbonToolButton.deferredPolish(), batchUpdates(self):
+            yield self
+
     def addCategoriesBy(
         self,
         data: typing.Dict[
@@ -381,11 +432,12 @@ class RibbonBar(QtWidgets.QMenuBar):
         :return: A dict of categories of the ribbon.
         """
         categories = {}
-        for title, category_data in data.items():
-            style = category_data.get("style", RibbonCategoryStyle.Normal)
-            color = category_data.get("color", None)
-            categories[title] = self.addCategory(title, style, color)
-            categories[title].addPanelsBy(category_data.get("panels", {}))
+        with self.batchUpdate():
+            for title, category_data in data.items():
+                style = category_data.get("style", RibbonCategoryStyle.Normal)
+                color = category_data.get("color", None)
+                categories[title] = self.addCategory(title, style, color)
+                categories[title].addPanelsBy(category_data.get("panels", {}))
         return categories
 
     def addCategory(
@@ -402,12 +454,56 @@ class RibbonBar(QtWidgets.QMenuBar):
                       will be used.
         :return: The newly created category.
         """
-        if title in self._categories:
+        if title in self._categories or title in self._lazyCategories:
             raise ValueError(f"Category with title {title} already exists.")
         if style == RibbonCategoryStyle.Context:
             if color is None:
                 color = contextColors[self._contextCategoryCount % len(contextColors)]
                 self._contextCategoryCount += 1
+        category = self._createCategory(title, style, color)
+        if style == RibbonCategoryStyle.Normal:
+            self._titleWidget.tabBar().addTab(title, color)
+        elif style == RibbonCategoryStyle.Context:
+            category.hide()
+        if len(self._categories) + len(self._lazyCategories) == 1:
+            self._titleWidget.tabBar().setCurrentIndex(1)
+            self.showCategoryByIndex(1)
+        return category
+
+    def addLazyCategory(self, title: str, color: QtGui.QColor = None, key: str = None) -> int:
+        """Add a new normal category that only exists as a tab until it is shown for the first time.
+
+        The category widget is created when the tab is selected or the category is requested
+        with :meth:`category` or :meth:`currentCategory`. Like with :meth:`addCategory`, the first
+        category is selected and therefore created right away.
+
+        :param title: The title of the category.
+        :param color: The color of the tab.
+        :param key: The key of the tab, see :meth:`RibbonTabBar.setTabKey`.
+        :return: The index of the tab.
+        """
+        if title in self._categories or title in self._lazyCategories:
+            raise ValueError(f"Category with title {title} already exists.")
+        self._lazyCategories[title] = (RibbonCategoryStyle.Normal, color)
+        index = self._titleWidget.tabBar().addTab(title, color, key)
+        if len(self._categories) + len(self._lazyCategories) == 1:
+            self._titleWidget.tabBar().setCurrentIndex(index)
+            self.showCategoryByIndex(index)
+        return index
+
+    def _createCategory(
+        self,
+        title: str,
+        style: RibbonCategoryStyle,
+        color: typing.Optional[QtGui.QColor],
+    ) -> typing.Union[RibbonNormalCategory, RibbonContextCategory]:
+        """Create the widget of a category and add it to the stacked widget.
+
+        :param title: The title of the category.
+        :param style: The button style of the category.
+        :param color: The color of the context category.
+        :return: The newly created category.
+        """
         category = (
             RibbonContextCategory(title, color, self)
             if style == RibbonCategoryStyle.Context
@@ -421,17 +517,21 @@ class RibbonBar(QtWidgets.QMenuBar):
             - self._mainLayout.contentsMargins().bottom()
             - self._titleWidget.height()
         )  # 4: extra space for drawing lines when debugging
+        if self._batchStack is not None:
+            self._batchStack.enter_context(category.batchUpdate())
         self._categories[title] = category
         self._stackedWidget.addWidget(category)
-        if style == RibbonCategoryStyle.Normal:
-            self._titleWidget.tabBar().addTab(title, color)
-        elif style == RibbonCategoryStyle.Context:
-            category.hide()
-        if len(self._categories) == 1:
-            self._titleWidget.tabBar().setCurrentIndex(1)
-            self.showCategoryByIndex(1)
         return category
 
+    def _materializeCategory(self, title: str) -> RibbonCategory:
+        """Create the widget of a lazy category.
+
+        :param title: The title of the lazy category.
+        :return: The newly created category.
+        """
+        style, color = self._lazyCategories.pop(title)
+        return self._createCategory(title, style, color)
+
     def addNormalCategory(self, title: str) -> RibbonNormalCategory:
         """Add a new category to the ribbon.
 
@@ -483,7 +583,9 @@ class RibbonBar(QtWidgets.QMenuBar):
         :param index: tab index
         """
         self._currentTabIndex = index
-        title = self._titleWidget.tabBar().tabText(index)  # 0 is the file tab
+        title = self._titleWidget.tabBar().tabTitle(index)  # 0 is the file tab
+        if title in self._lazyCategories:
+            self._materializeCategory(title)
         if title in self._categories:
             self._stackedWidget.setCurrentWidget(self._categories[title])
 
@@ -522,7 +624,7 @@ class RibbonBar(QtWidgets.QMenuBar):
 
         :return: Whether the category is shown.
         """
-        return category.title() in self._titleWidget.tabBar().tabTitles()
+        return self._titleWidget.tabBar().hasTab(category.title())
 
     def removeCategory(self, category: RibbonCategory):
         """Remove a category from the ribbon.
@@ -531,6 +633,33 @@ class RibbonBar(QtWidgets.QMenuBar):
         """
         self.tabBar().removeTab(self._titleWidget.tabBar().indexOf(category.title()))
         self._stackedWidget.removeWidget(category)
+        self._categories.pop(category.title(), None)
+
+    def removeLazyCategory(self, title: str):
+        """Remove a lazy category that has not been shown yet from the ribbon.
+
+        :param title: The title of the category.
+        """
+        self._lazyCategories.pop(title)
+        self.tabBar().removeTab(self._titleWidget.tabBar().indexOf(title))
+
+    def unloadCategory(self, title: str):
+        """Destroy the widget of a normal category and keep only its tab, like the tab of a lazy category.
+
+        The category is created again, without its panels, when it is used the next time.
+
+        :param title: The title of the category.
+        """
+        category = self._categories[title]
+        if not isinstance(category, RibbonNormalCategory):
+            raise ValueError(f"Only normal categories can be unloaded, {title} is not one.")
+        if self._stackedWidget.currentWidget() is category:
+            raise ValueError(f"Category {title} is shown and can't be unloaded.")
+        self._categories.pop(title)
+        self._stackedWidget.removeWidget(category)
+        # the tab stays, and so does its color
+        self._lazyCategories[title] = (RibbonCategoryStyle.Normal, self.tabBar().tabColor(title))
+        category.deleteLater()
 
     def removeCategories(self, categories: RibbonContextCategories):
         """Remove a list of categories from the ribbon.
@@ -540,14 +669,31 @@ class RibbonBar(QtWidgets.QMenuBar):
         for category in categories.values():
             self.removeCategory(category)
 
+    def dispose(self):
+        """Release the ribbon, it must not be used afterwards.
+
+        The signals of the title widget are disconnected, the categories are deleted, lazy categories are dropped
+        and the ribbon itself is scheduled for deletion, so nothing keeps its widgets alive.
+        """
+        self._titleWidget.helpButtonClicked.disconnect(self.helpButtonClicked)
+        self._titleWidget.collapseRibbonButtonClicked.disconnect(self._collapseButtonClicked)
+        self._titleWidget.tabBar().currentChanged.disconnect(self.showCategoryByIndex)  # type: ignore
+        for category in self._categories.values():
+            self._stackedWidget.removeWidget(category)
+            category.deleteLater()
+        self._categories = {}
+        self._lazyCategories = {}
+        self.deleteLater()
+
     def setCurrentCategory(self, category: RibbonCategory):
         """Set the current category.
 
         :param category: The category to set.
         """
         self._stackedWidget.setCurrentWidget(category)
-        if category.title() in self._titleWidget.tabBar().tabTitles():
-            self._titleWidget.tabBar().setCurrentIndex(self._titleWidget.tabBar().indexOf(category.title()))
+        index = self._titleWidget.tabBar().indexOf(category.title())
+        if index >= 0:
+            self._titleWidget.tabBar().setCurrentIndex(index)
         else:
             raise ValueError(
                 f"Category {category.title()} is not in the ribbon, "
@@ -559,7 +705,7 @@ class RibbonBar(QtWidgets.QMenuBar):
 
         :return: The current category.
         """
-        return self._categories[self._titleWidget.tabBar().tabText(self._titleWidget.tabBar().currentIndex())]
+        return self.category(self._titleWidget.tabBar().tabTitle(self._titleWidget.tabBar().currentIndex()))
 
     def minimumSizeHint(self) -> QtCore.QSize:
         """Return the minimum size hint of the widget.
@@ -577,7 +723,7 @@ class RibbonBar(QtWidgets.QMenuBar):
         if not self._ribbonVisible:
             self._ribbonVisible = True
             self.collapseRibbonButton().setToolTip("Collapse Ribbon")
-            self.collapseRibbonButton().setIcon(QtGui.QIcon(DataFile("icons/up.png")))
+            self.collapseRibbonButton().setIcon(DataIcon("icons/up.png"))
             self._stackedWidget.setVisible(True)
             self.setFixedSize(self.sizeHint())
 
@@ -586,7 +732,7 @@ class RibbonBar(QtWidgets.QMenuBar):
         if self._ribbonVisible:
             self._ribbonVisible = False
             self.collapseRibbonButton().setToolTip("Expand Ribbon")
-            self.collapseRibbonButton().setIcon(QtGui.QIcon(DataFile("icons/down.png")))
+            self.collapseRibbonButton().setIcon(DataIcon("icons/down.png"))
             self._stackedWidget.setVisible(False)
             self.setFixedSize(self.sizeHint().width(), self._titleWidget.size().height() + 5)  # type: ignore
 
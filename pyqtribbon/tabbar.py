@@ -11,8 +11,8 @@ class RibbonTabBar(QtWidgets.QTabBar):
     #: context category dark color height
     _contextCategoryDarkColorHeight = 5
 
-    _tabColors: typing.Dict[str, typing.Union[QtCore.Qt.GlobalColor, QtGui.QColor]] = {}
-    _associated_tabs = {}
+    #: color of the selected tab's text, None if the application style decides
+    _selectedTabColor: typing.Optional[str] = None
 
     def __init__(self, parent=None):
         """Create a new tab bar.
@@ -20,8 +20,21 @@ class RibbonTabBar(QtWidgets.QTabBar):
         :param parent: The parent widget.
         """
         super().__init__(parent)
+        #: tab title or name of associated tabs -> color
+        self._tabColors: typing.Dict[str, typing.Union[QtCore.Qt.GlobalColor, QtGui.QColor]] = {}
+        #: tab title -> titles of the tabs associated with it
+        self._associated_tabs: typing.Dict[str, typing.List[str]] = {}
+        #: titles and keys of the tabs in tab order, the titles are kept as they were added, even if
+        #: a style adds accelerator ampersands to the tab texts later on
+        self._titles: typing.List[str] = []
+        self._keys: typing.List[str] = []
+        #: title -> index and key -> index, rebuilt on the next lookup after tabs moved
+        self._titleIndices: typing.Dict[str, int] = {}
+        self._keyIndices: typing.Dict[str, int] = {}
+        self._indicesValid = True
 
         self.currentChanged.connect(self.changeColor)
+        self.tabMoved.connect(self._tabMoved)
         self.setDrawBase(False)
 
     def indexOf(self, tabName: str) -> int:
@@ -30,27 +43,139 @@ class RibbonTabBar(QtWidgets.QTabBar):
         :param tabName: The name of the tab.
         :return: The index of the tab.
         """
-        for i in range(self.count()):
-            if self.tabText(i) == tabName:
-                return i
-        return -1
+        self._updateIndices()
+        return self._titleIndices.get(tabName, -1)
+
+    def indexOfKey(self, key: str) -> int:
+        """Return the index of the tab with the given key.
+
+        :param key: The key of the tab.
+        :return: The index of the tab.
+        """
+        self._updateIndices()
+        return self._keyIndices.get(key, -1)
+
+    def hasTab(self, tabName: str) -> bool:
+        """Return whether there is a tab with the given name.
+
+        :param tabName: The name of the tab.
+        :return: Whether the tab exists.
+        """
+        return self.indexOf(tabName) >= 0
+
+    def tabTitle(self, index: int) -> str:
+        """Return the title of a tab, as it was added, without accelerators added by the style.
+
+        :param index: The index of the tab.
+        :return: The title of the tab, empty if there is no such tab.
+        """
+        return self._titles[index] if 0 <= index < len(self._titles) else ""
+
+    def tabKey(self, index: int) -> str:
+        """Return the key of a tab, which defaults to the title of the tab.
+
+        :param index: The index of the tab.
+        :return: The key of the tab, empty if there is no such tab.
+        """
+        return self._keys[index] if 0 <= index < len(self._keys) else ""
+
+    def setTabKey(self, index: int, key: str):
+        """Set the key of a tab, a name that doesn't change with the language, e.g. the name of a workbench.
+
+        :param index: The index of the tab.
+        :param key: The key of the tab.
+        """
+        oldKey = self._keys[index]
+        self._keys[index] = key
+        if not self._indicesValid:
+            return
+        # only the entries of this tab change, like in _updateIndices the first tab with a key wins
+        if self._keyIndices.get(oldKey) == index:
+            del self._keyIndices[oldKey]
+            if oldKey in self._keys:
+                self._keyIndices[oldKey] = self._keys.index(oldKey)
+        if self._keyIndices.get(key, index) >= index:
+            self._keyIndices[key] = index
 
     def tabTitles(self) -> typing.List[str]:
         """Return the titles of all tabs.
 
         :return: The titles of all tabs.
         """
-        return [self.tabText(i) for i in range(self.count())]
+        return list(self._titles)
 
-    def addTab(self, text: str, color: QtGui.QColor = None, *args, **kwargs) -> int:
+    def setTabText(self, index: int, text: str):
+        """Set the text of a tab, the text becomes the title of the tab.
+
+        :param index: The index of the tab.
+        :param text: The text of the tab.
+        """
+        super().setTabText(index, text)
+        self._titles[index] = text
+        self._indicesValid = False
+
+    def addTab(self, text: str, color: QtGui.QColor = None, key: str = None, *args, **kwargs) -> int:
         """Add a new tab to the tab bar.
 
         :param text: The text of the tab.
         :param color: The color of the tab.
+        :param key: The key of the tab, the text is used if None.
         :return: The index of the tab.
         """
         self._tabColors[text] = color
-        return super().addTab(text)
+        # Qt selects the first tab before the tab is registered, so the selection is announced once the title and
+        # the key of the tab are known
+        first = self.count() == 0
+        blocked = self.blockSignals(True) if first else False
+        index = super().addTab(text)
+        if key is not None:
+            self.setTabKey(index, key)
+        if first:
+            self.blockSignals(blocked)
+            self.currentChanged.emit(index)
+        return index
+
+    def tabInserted(self, index: int):
+        super().tabInserted(index)
+        title = self.tabText(index)
+        self._titles.insert(index, title)
+        self._keys.insert(index, title)
+        if index == len(self._titles) - 1:
+            # appending doesn't move other tabs
+            self._titleIndices.setdefault(title, index)
+            self._keyIndices.setdefault(title, index)
+        else:
+            self._indicesValid = False
+
+    def tabRemoved(self, index: int):
+        super().tabRemoved(index)
+        title = self._titles.pop(index)
+        key = self._keys.pop(index)
+        if index == len(self._titles):
+            # removing the last tab doesn't move other tabs
+            if self._titleIndices.get(title) == index:
+                del self._titleIndices[title]
+            if self._keyIndices.get(key) == index:
+                del self._keyIndices[key]
+        else:
+            self._indicesValid = False
+        if title not in self._titles:
+            # the color of a removed tab would be kept forever otherwise
+            self._tabColors.pop(title, None)
+            self._associated_tabs.pop(title, None)
+
+    def _tabMoved(self, fromIndex: int, toIndex: int):
+        self._titles.insert(toIndex, self._titles.pop(fromIndex))
+        self._keys.insert(toIndex, self._keys.pop(fromIndex))
+        self._indicesValid = False
+
+    def _updateIndices(self):
+        if self._indicesValid:
+            return
+        # with duplicates, the first tab is found like before
+        self._titleIndices = {title: index for index, title in reversed(list(enumerate(self._titles)))}
+        self._keyIndices = {key: index for index, key in reversed(list(enumerate(self._keys)))}
+        self._indicesValid = True
 
     def addAssociatedTabs(self, name: str, texts: typing.List[str], color: QtGui.QColor) -> typing.List[int]:
         """Add associated multiple tabs which have the same color to the tab bar.
@@ -70,28 +195,39 @@ class RibbonTabBar(QtWidgets.QTabBar):
 
         :param titles: The titles of the tabs to remove.
         """
-        tabTitles = self.tabTitles()
         for title in titles:
-            if title in tabTitles:
+            if self.hasTab(title):
                 self.removeTab(self.indexOf(title))
-                del self._tabColors[title]
-                if title in self._associated_tabs:
-                    del self._associated_tabs[title]
+                self._tabColors.pop(title, None)
+                self._associated_tabs.pop(title, None)
 
     def currentTabColor(self) -> QtGui.QColor:
         """Current tab color
 
         :return: Current tab color
         """
-        return self._tabColors[self.tabText(self.currentIndex())]
+        return self._tabColors[self.tabTitle(self.currentIndex())]
+
+    def tabColor(self, title: str) -> typing.Optional[QtGui.QColor]:
+        """Return the color of a tab.
+
+        :param title: The title of the tab.
+        :return: The color of the tab, None if it has none.
+        """
+        return self._tabColors.get(title)
 
     def changeColor(self, inx: int) -> None:
-        """Change tab's color."""
-
-        if self.count() > 0:
-            currentTabText = self.tabText(inx)
-            currentTabColor = self._tabColors[currentTabText]
-            if currentTabColor is not None:
-                self.setStyleSheet("RibbonTabBar::tab:selected {color: %s;}" % QtGui.QColor(currentTabColor).name())
-            else:
-                self.setStyleSheet("RibbonTabBar::tab:selected {color: black;}")
+        """Change tab's color.
+
+        The color is set by a stylesheet of the tab bar, so it wins over the tab rules of the application
+        stylesheet. The stylesheet only changes when the color of the selected tab does, switching between
+        tabs of the same color doesn't repolish the tab bar.
+        """
+        color = None
+        if 0 <= inx < self.count():
+            tabColor = self._tabColors.get(self.tabTitle(inx))
+            if tabColor is not None:
+                color = QtGui.QColor(tabColor).name()
+        if color != self._selectedTabColor:
+            self._selectedTabColor = color
+            self.setStyleSheet("RibbonTabBar::tab:selected {color: %s;}" % color if color is not None else "")
@@ -0,0 +1,149 @@
+import re
+import typing
+
+from PySide import QtWidgets
+
+from .constants import RibbonStyle
+from .utils import DataFile
+
+#: The dynamic property of the ribbon bar that selects the rules of a style.
+themeProperty = "ribbonTheme"
+
+_commentPattern = re.compile(r"/\*.*?\*/", re.DOTALL)
+_rulePattern = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_subjectPattern = re.compile(r"^[A-Za-z_]\w*")
+
+
+def parseStyleSheet(text: str) -> typing.Dict[str, str]:
+    """Split a style sheet into its rules.
+
+    :param text: The style sheet.
+    :return: selector -> declarations, selectors of a rule with several selectors are split up.
+    """
+    rules = {}
+    for selectors, declarations in _rulePattern.findall(_commentPattern.sub("", text)):
+        declarations = " ".join(declarations.split())
+        for selector in selectors.split(","):
+            selector = " ".join(selector.split())
+            if selector:
+                rules[selector] = rules.get(selector, "") + declarations
+    return rules
+
+
+def subjectClass(selector: str) -> typing.Optional[str]:
+    """Return the class of the widgets a selector applies to.
+
+    :param selector: The selector.
+    :return: The class name, None if the selector applies to widgets of any class.
+    """
+    match = _subjectPattern.match(selector.split(" ")[-1].split(">")[-1].strip())
+    return match.group(0) if match else None
+
+
+class RibbonTheme(object):
+    """The rules of a ribbon style, read from its style file once.
+
+    The rules are scoped to ribbon bars whose `ribbonTheme` property holds the name of the theme,
+    so the rules of all themes can be set at once and a theme is selected by changing the property.
+    """
+
+    def __init__(self, style: RibbonStyle):
+        """Read a theme.
+
+        :param style: The style of the theme.
+        """
+        self._style = style
+        self._name = style.name.lower()
+        with open(DataFile(f"styles/{self._name}.qss"), "r") as file:
+            self._rules = parseStyleSheet(file.read())
+
+    def style(self) -> RibbonStyle:
+        """Return the style of the theme."""
+        return self._style
+
+    def name(self) -> str:
+        """Return the name of the theme, the value of the `ribbonTheme` property."""
+        return self._name
+
+    def rules(self) -> typing.Dict[str, str]:
+        """Return the rules of the theme.
+
+        :return: selector -> declarations
+        """
+        return self._rules
+
+    def scopedStyleSheet(self) -> str:
+        """Return the rules of the theme, limited to ribbon bars using the theme."""
+        scope = f'RibbonBar[{themeProperty}="{self._name}"]'
+        rules = []
+        for selector, declarations in self._rules.items():
+            if re.match(r"RibbonBar(?![\w])", selector):
+                selector = scope + selector[len("RibbonBar") :]
+            else:
+                selector = f"{scope} {selector}"
+            rules.append(f"{selector} {{ {declarations} }}")
+        return "\n".join(rules)
+
+    def changedClasses(self, other: "RibbonTheme") -> typing.Optional[typing.Set[str]]:
+        """Return the classes of the widgets that are styled differently by another theme.
+
+        :param other: The other theme.
+        :return: The class names, None if all widgets are affected.
+        """
+        classes = {"RibbonBar"}
+        for selector in self._rules.keys() | other._rules.keys():
+            if self._rules.get(selector) == other._rules.get(selector):
+                continue
+            className = subjectClass(selector)
+            if className is None:
+                return None
+            classes.add(className)
+        return classes
+
+
+_themes: typing.Dict[RibbonStyle, RibbonTheme] = {}
+_styleSheet: typing.Optional[str] = None
+
+
+def theme(style: RibbonStyle) -> RibbonTheme:
+    """Return the theme of a style, it is only read on first use.
+
+    :param style: The style.
+    :return: The theme.
+    """
+    if style not in _themes:
+        _themes[style] = RibbonTheme(style)
+    return _themes[style]
+
+
+def ribbonStyleSheet() -> str:
+    """Return the style sheet with the base rules and the scoped rules of all themes, it is only built once.
+
+    :return: The style sheet.
+    """
+    global _styleSheet
+    if _styleSheet is None:
+        with open(DataFile("styles/base.qss"), "r") as file:
+            parts = [file.read()]
+        parts.extend(theme(style).scopedStyleSheet() for style in RibbonStyle)
+        _styleSheet = "\n".join(parts)
+    return _styleSheet
+
+
+def repolish(root: QtWidgets.QWidget, classes: typing.Optional[typing.Set[str]] = None):
+    """Repolish a widget and those of its children that are instances of the given classes.
+
+    :param root: The root widget.
+    :param classes: The class names, all widgets are repolished if None.
+    """
+    widgets = [root] + root.findChildren(QtWidgets.QWidget)
+    if classes is not None:
+        widgets = [
+            widget
+            for widget in widgets
+            if any(widget.inherits(name) for name in classes)
+        ]
+    for widget in widgets:
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+        widget.update()
@@ -0,0 +1,169 @@
+import typing
+
+from PySide import QtCore, QtGui
+
+from .utils import LRUCache
+
+#: A thumbnail source, either the path of an image or a callable returning the image scaled to the given size.
+ThumbnailSource = typing.Union[str, typing.Callable[[QtCore.QSize], QtGui.QImage]]
+
+
+def loadThumbnail(source: ThumbnailSource, size: QtCore.QSize) -> QtGui.QImage:
+    """Load an image scaled to fit into the given size, safe to call outside of the GUI thread.
+
+    :param source: The source of the image.
+    :param size: The maximum size of the thumbnail.
+    :return: The thumbnail, a null image if the source can't be read.
+    """
+    if callable(source):
+        image = source(size)
+    else:
+        reader = QtGui.QImageReader(source)
+        reader.setAutoTransform(True)
+        if reader.size().isValid():
+            # decoders like JPEG and SVG render the scaled image directly
+            reader.setScaledSize(reader.size().scaled(size, QtCore.Qt.KeepAspectRatio))
+        image = reader.read()
+    if not image.isNull() and (
+        image.width() > size.width() or image.height() > size.height()
+    ):
+        image = image.scaled(
+            size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
+        )
+    return image
+
+
+class _ThumbnailSignals(QtCore.QObject):
+    #: Signal, a thumbnail was loaded, with the cache key and the image.
+    finished = QtCore.Signal(object, QtGui.QImage)
+
+
+class _ThumbnailTask(QtCore.QRunnable):
+    def __init__(
+        self,
+        cacheKey,
+        source: ThumbnailSource,
+        size: QtCore.QSize,
+        signals: _ThumbnailSignals,
+    ):
+        super().__init__()
+        self._cacheKey = cacheKey
+        self._source = source
+        self._size = size
+        self._signals = signals
+
+    def run(self):
+        try:
+            image = loadThumbnail(self._source, self._size)
+        except Exception:  # a failing loader must not take the pool thread down
+            image = QtGui.QImage()
+        self._signals.finished.emit(self._cacheKey, image)
+
+
+class RibbonThumbnailLoader(QtCore.QObject):
+    """Decodes thumbnails in a thread pool and keeps them in a bounded cache.
+
+    :meth:`thumbnail` never blocks, it returns None until the thumbnail is loaded and
+    :attr:`thumbnailReady` is emitted in the GUI thread once it is available.
+    """
+
+    #: Signal, the thumbnail of the key is available.
+    thumbnailReady = QtCore.Signal(object)
+
+    def __init__(self, budget: int = 32 * 1024 * 1024, parent=None):
+        """Create a new thumbnail loader.
+
+        :param budget: The memory budget of the cached thumbnails in bytes.
+        :param parent: The parent object.
+        """
+        super().__init__(parent)
+        self._cache = LRUCache(budget)
+        self._pending = set()
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(max(QtCore.QThread.idealThreadCount() - 1, 1))
+        self._signals = _ThumbnailSignals(self)
+        self._signals.finished.connect(self._finished)
+
+    def thumbnail(
+        self, key, source: ThumbnailSource, size: QtCore.QSize
+    ) -> typing.Optional[QtGui.QIcon]:
+        """Return a thumbnail, it is loaded in the background if it is not cached.
+
+        :param key: The key of the thumbnail, e.g. the path of the image.
+        :param source: The source of the image.
+        :param size: The maximum size of the thumbnail in device pixels.
+        :return: The thumbnail, None if it is not loaded yet, a null icon if it can't be loaded.
+        """
+        cacheKey = (key, size.width(), size.height())
+        icon = self._cache.get(cacheKey)
+        if icon is None and cacheKey not in self._pending:
+            self._pending.add(cacheKey)
+            self._pool.start(
+                _ThumbnailTask(cacheKey, source, QtCore.QSize(size), self._signals)
+            )
+        return icon
+
+    def _finished(self, cacheKey, image: QtGui.QImage):
+        self._pending.discard(cacheKey)
+        # pixmaps can only be created in the GUI thread
+        icon = (
+            QtGui.QIcon(QtGui.QPixmap.fromImage(image))
+            if not image.isNull()
+            else QtGui.QIcon()
+        )
+        self._cache.put(cacheKey, icon, max(image.width() * image.height() * 4, 1))
+        self.thumbnailReady.emit(cacheKey[0])
+
+    def budget(self) -> int:
+        """Return the memory budget of the cached thumbnails in bytes."""
+        return self._cache.budget()
+
+    def setBudget(self, budget: int):
+        """Set the memory budget of the cached thumbnails in bytes.
+
+        :param budget: The memory budget.
+        """
+        self._cache.setBudget(budget)
+
+    def clear(self):
+        """Remove all thumbnails from the cache, loads in progress are not affected."""
+        self._cache.clear()
+
+
+_thumbnailLoader: typing.Optional[RibbonThumbnailLoader] = None
+_placeholderIcon: typing.Optional[QtGui.QIcon] = None
+
+
+def thumbnailLoader() -> RibbonThumbnailLoader:
+    """Return the thumbnail loader shared by all galleries.
+
+    It is created on first use, after the application, and is destroyed together with it.
+    """
+    global _thumbnailLoader
+    if _thumbnailLoader is None:
+        _thumbnailLoader = RibbonThumbnailLoader(
+            parent=QtCore.QCoreApplication.instance()
+        )
+        _thumbnailLoader.destroyed.connect(_forgetThumbnailLoader)
+    return _thumbnailLoader
+
+
+def _forgetThumbnailLoader():
+    global _thumbnailLoader
+    _thumbnailLoader = None
+
+
+def placeholderIcon() -> QtGui.QIcon:
+    """Return the icon shown while a thumbnail is loading."""
+    global _placeholderIcon
+    if _placeholderIcon is None:
+        pixmap = QtGui.QPixmap(64, 64)
+        pixmap.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pixmap)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtGui.QPen(QtGui.QColor(160, 160, 160), 2))
+        painter.setBrush(QtGui.QColor(224, 224, 224, 128))
+        painter.drawRoundedRect(QtCore.QRectF(4, 4, 56, 56), 6, 6)
+        painter.end()
+        _placeholderIcon = QtGui.QIcon(pixmap)
+    return _placeholderIcon
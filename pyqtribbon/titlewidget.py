@@ -4,7 +4,7 @@ from PySide import QtCore, QtGui, QtWidgets
 
 from .menu import RibbonMenu
 from .tabbar import RibbonTabBar
-from .utils import DataFile
+from .utils import DataIcon
 
 
 class RibbonApplicationButton(QtWidgets.QToolButton):
@@ -35,10 +35,6 @@ class RibbonTitleWidget(QtWidgets.QFrame):
     #: Signal, the collapse button wa clicked.
     collapseRibbonButtonClicked = QtCore.Signal(bool)
 
-    #: Buttons
-    _quickAccessButtons = []
-    _rightToolButtons = []
-
     _quickAccessButtonHeight = 30
     _rightButtonHeight = 24
 
@@ -67,6 +63,10 @@ class RibbonTitleWidget(QtWidgets.QFrame):
             title = "PyQtRibbon"
             parent = args[0] if len(args) > 0 else kwargs.get("parent", None)
         super().__init__(parent)
+        #: Buttons
+        self._quickAccessButtons: typing.List[QtWidgets.QToolButton] = []
+        self._rightToolButtons: typing.List[QtWidgets.QToolButton] = []
+
         # Tab bar layout
         self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)  # type: ignore
         self._tabBarLayout = QtWidgets.QHBoxLayout(self)
@@ -75,7 +75,7 @@ class RibbonTitleWidget(QtWidgets.QFrame):
 
         # Application
         self._applicationButton = RibbonApplicationButton()  # type: ignore
-        self._applicationButton.setIcon(QtGui.QIcon(DataFile("icons/python.png")))
+        self._applicationButton.setIcon(DataIcon("icons/python.png"))
         self._applicationButton.setIconSize(QtCore.QSize(self._quickAccessButtonHeight, self._quickAccessButtonHeight))
         self._applicationButton.setText("PyQtRibbon")
         self._applicationButton.setToolTip("PyQtRibbon")
@@ -97,13 +97,13 @@ class RibbonTitleWidget(QtWidgets.QFrame):
         self._rightToolBar.setIconSize(QtCore.QSize(self._rightButtonHeight, self._rightButtonHeight))
         self._collapseRibbonButton = QtWidgets.QToolButton(self)
         self._collapseRibbonButton.setIconSize(QtCore.QSize(self._rightButtonHeight, self._rightButtonHeight))
-        self._collapseRibbonButton.setIcon(QtGui.QIcon(DataFile("icons/up.png")))
+        self._collapseRibbonButton.setIcon(DataIcon("icons/up.png"))
         self._collapseRibbonButton.setAutoRaise(True)
         self._collapseRibbonButton.setToolTip("Collapse Ribbon")
         self._collapseRibbonButton.clicked.connect(self.collapseRibbonButtonClicked)  # type: ignore
         self._helpButton = QtWidgets.QToolButton(self)
         self._helpButton.setIconSize(QtCore.QSize(self._rightButtonHeight, self._rightButtonHeight))
-        self._helpButton.setIcon(QtGui.QIcon(DataFile("icons/help.png")))
+        self._helpButton.setIcon(DataIcon("icons/help.png"))
         self._helpButton.setAutoRaise(True)
         self._helpButton.setToolTip("Help")
         self._helpButton.clicked.connect(self.helpButtonClicked)  # type: ignore
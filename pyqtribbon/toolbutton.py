@@ -1,3 +1,6 @@
+import contextlib
+import typing
+
 from PySide import QtCore, QtWidgets
 
 from .constants import RibbonButtonStyle
@@ -7,7 +10,8 @@ from .menu import RibbonMenu
 class RibbonToolButton(QtWidgets.QToolButton):
     """Tool button that is showed in the ribbon."""
 
-    _buttonStyle: RibbonButtonStyle
+    #: None until the first style is set, so the first one always sets the `buttonStyle` property
+    _buttonStyle: typing.Optional[RibbonButtonStyle] = None
 
     _smallButtonIconSize = 24
     _mediumButtonIconSize = int(_smallButtonIconSize * 1.5)
@@ -15,6 +19,9 @@ class RibbonToolButton(QtWidgets.QToolButton):
 
     _maximumIconSize = 64
 
+    #: buttons waiting to be repolished at the end of :meth:`deferredPolish`, None outside of it
+    _deferredPolishButtons: typing.Optional[typing.Set["RibbonToolButton"]] = None
+
     def __init__(self, parent=None):
         """Create a new ribbon tool button.
 
@@ -52,56 +59,64 @@ class RibbonToolButton(QtWidgets.QToolButton):
     def setButtonStyle(self, style: RibbonButtonStyle):
         """Set the button style of the button.
 
+        The menu indicator is styled by the rules for the `buttonStyle` property in base.qss.
+
         :param style: The button style of the button.
         """
+        # the stored style is compared, reading the dynamic property back is slow and unreliable with some bindings
+        changed = style != self._buttonStyle
         self._buttonStyle = style
         if style == RibbonButtonStyle.Small:
             height = self._smallButtonIconSize
-            height = min(height, self._maximumIconSize)
-            self.setIconSize(QtCore.QSize(height, height))
-            self.setToolButtonStyle(QtCore.Qt.ToolButtonTextBesideIcon)
-            self.setStyleSheet(
-                """
-                RibbonToolButton::menu-indicator {
-                    subcontrol-origin: padding;
-                    subcontrol-position: right;
-                    right: -5px;
-                }
-                """
-            )
+            toolButtonStyle = QtCore.Qt.ToolButtonTextBesideIcon
         elif style == RibbonButtonStyle.Medium:
             height = self._mediumButtonIconSize
-            height = min(height, self._maximumIconSize)
-            self.setIconSize(QtCore.QSize(height, height))
-            self.setToolButtonStyle(QtCore.Qt.ToolButtonTextBesideIcon)
-            self.setStyleSheet(
-                """
-                RibbonToolButton::menu-indicator {
-                    subcontrol-origin: padding;
-                    subcontrol-position: right;
-                    right: -5px;
-                }
-                """
-            )
-        elif style == RibbonButtonStyle.Large:
+            toolButtonStyle = QtCore.Qt.ToolButtonTextBesideIcon
+        else:
             height = self._largeButtonIconSize
-            height = min(height, self._maximumIconSize)
-            self.setIconSize(QtCore.QSize(height, height))
-            self.setToolButtonStyle(QtCore.Qt.ToolButtonTextUnderIcon)
-            self.setStyleSheet(
-                """
-                RibbonToolButton[popupMode="0"]::menu-indicator {
-                    subcontrol-origin: padding;
-                    subcontrol-position: bottom;
-                    bottom: -5px;
-                }
-                RibbonToolButton[popupMode="2"]::menu-indicator {
-                    subcontrol-origin: padding;
-                    subcontrol-position: bottom;
-                    bottom: -5px;
-                }
-                """
-            )
+            toolButtonStyle = QtCore.Qt.ToolButtonTextUnderIcon
+        height = min(height, self._maximumIconSize)
+        self.setIconSize(QtCore.QSize(height, height))
+        self.setToolButtonStyle(toolButtonStyle)
+        if changed:
+            self.setProperty("buttonStyle", int(style))
+            self._repolish()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def deferredPolish():
+        """Postpone the repolishing of buttons whose style changes until the end of the block.
+
+        Use it when many buttons are created or restyled at once, e.g. while building panels::
+
+            with RibbonToolButton.deferredPolish():
+                for ...:
+                    panel.addSmallButton(...)
+        """
+        outermost = RibbonToolButton._deferredPolishButtons is None
+        if outermost:
+            RibbonToolButton._deferredPolishButtons = set()
+        try:
+            yield
+        finally:
+            if outermost:
+                buttons = RibbonToolButton._deferredPolishButtons
+                RibbonToolButton._deferredPolishButtons = None
+                for button in buttons:
+                    try:
+                        button._repolish()
+                    except RuntimeError:  # the button was deleted meanwhile
+                        pass
+
+    def _repolish(self):
+        # widgets that were never polished get their style when they are shown the first time
+        if not self.testAttribute(QtCore.Qt.WA_WState_Polished):
+            return
+        if RibbonToolButton._deferredPolishButtons is not None:
+            RibbonToolButton._deferredPolishButtons.add(self)
+            return
+        self.style().unpolish(self)
+        self.style().polish(self)
 
     def buttonStyle(self) -> RibbonButtonStyle:
         """Get the button style of the button.
@@ -115,6 +130,6 @@ class RibbonToolButton(QtWidgets.QToolButton):
 
         :return: The added ribbon menu.
         """
-        menu = RibbonMenu()
+        menu = RibbonMenu(self)
         self.setMenu(menu)
         return menu
@@ -1,4 +1,9 @@
+import collections
+import contextlib
 import os
+import typing
+
+from PySide import QtCore, QtGui
 
 
 def DataFile(filename):
@@ -8,3 +13,223 @@ def DataFile(filename):
     :return: The path to the data file.
     """
     return os.path.join(os.path.dirname(__file__), filename)
+
+
+class LRUCache(object):
+    """A cache that drops the least recently used entries when the total cost of its entries exceeds a budget."""
+
+    def __init__(self, budget: int):
+        """Create a new cache.
+
+        :param budget: The maximum total cost of the entries.
+        """
+        self._budget = budget
+        self._cost = 0
+        #: key -> (value, cost), ordered from least to most recently used
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the value of an entry and mark it as recently used.
+
+        :param key: The key of the entry.
+        :param default: The value returned if there is no such entry.
+        :return: The value of the entry.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, cost: int = 1):
+        """Add an entry, the least recently used entries are dropped if the budget is exceeded.
+
+        :param key: The key of the entry.
+        :param value: The value of the entry.
+        :param cost: The cost of the entry, e.g. its size in bytes.
+        """
+        if key in self._entries:
+            self._cost -= self._entries.pop(key)[1]
+        self._entries[key] = (value, cost)
+        self._cost += cost
+        self._evict()
+
+    def pop(self, key, default=None):
+        """Remove an entry and return its value.
+
+        :param key: The key of the entry.
+        :param default: The value returned if there is no such entry.
+        :return: The value of the entry.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self._cost -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        self._cost = 0
+
+    def budget(self) -> int:
+        """Return the maximum total cost of the entries."""
+        return self._budget
+
+    def setBudget(self, budget: int):
+        """Set the maximum total cost of the entries.
+
+        :param budget: The maximum total cost of the entries.
+        """
+        self._budget = budget
+        self._evict()
+
+    def cost(self) -> int:
+        """Return the total cost of the entries."""
+        return self._cost
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self):
+        # the most recent entry is always kept, even if it exceeds the budget on its own
+        while self._cost > self._budget and len(self._entries) > 1:
+            _, (_, cost) = self._entries.popitem(last=False)
+            self._cost -= cost
+
+
+class RibbonIconCache(object):
+    """Process wide cache of icons loaded from files, so every file is only decoded once.
+
+    Icons requested with a size get their normal and disabled pixmaps rendered up front,
+    so Qt doesn't have to generate the disabled state while painting.
+    """
+
+    #: Estimated cost of an icon that is decoded lazily by Qt.
+    _lazyIconCost = 64 * 64 * 4
+
+    def __init__(self, budget: int = 16 * 1024 * 1024):
+        """Create a new icon cache.
+
+        :param budget: The memory budget of the cache in bytes.
+        """
+        self._cache = LRUCache(budget)
+
+    def icon(
+        self, filename: str, size: typing.Union[int, QtCore.QSize] = None
+    ) -> QtGui.QIcon:
+        """Return the icon of a file.
+
+        :param filename: The path to the icon file.
+        :param size: The size the icon is shown with, if given, the pixmaps are rendered right away.
+        :return: The icon.
+        """
+        size = self._size(size)
+        key = (filename, None if size is None else (size.width(), size.height()))
+        icon = self._cache.get(key)
+        if icon is None:
+            icon = QtGui.QIcon(filename)
+            cost = self._lazyIconCost
+            if size is not None:
+                cost = 0
+                for mode in (QtGui.QIcon.Normal, QtGui.QIcon.Disabled):
+                    pixmap = self.pixmap(filename, size, mode)
+                    icon.addPixmap(pixmap, mode)
+                    cost += self._pixmapCost(pixmap)
+            self._cache.put(key, icon, cost)
+        return icon
+
+    def pixmap(
+        self,
+        filename: str,
+        size: typing.Union[int, QtCore.QSize],
+        mode: QtGui.QIcon.Mode = QtGui.QIcon.Normal,
+    ) -> QtGui.QPixmap:
+        """Return the pixmap of a file rendered with the given size and mode.
+
+        :param filename: The path to the icon file.
+        :param size: The size of the pixmap.
+        :param mode: The mode of the icon, e.g. QIcon.Disabled.
+        :return: The pixmap.
+        """
+        size = self._size(size)
+        # Qt 6 enums are hashable, but no ints
+        key = (filename, (size.width(), size.height()), mode)
+        pixmap = self._cache.get(key)
+        if pixmap is None:
+            pixmap = QtGui.QIcon(filename).pixmap(size, mode)
+            self._cache.put(key, pixmap, self._pixmapCost(pixmap))
+        return pixmap
+
+    def budget(self) -> int:
+        """Return the memory budget of the cache in bytes."""
+        return self._cache.budget()
+
+    def setBudget(self, budget: int):
+        """Set the memory budget of the cache in bytes.
+
+        :param budget: The memory budget.
+        """
+        self._cache.setBudget(budget)
+
+    def clear(self):
+        """Remove all icons from the cache."""
+        self._cache.clear()
+
+    @staticmethod
+    def _size(
+        size: typing.Union[int, QtCore.QSize, None]
+    ) -> typing.Optional[QtCore.QSize]:
+        return QtCore.QSize(size, size) if isinstance(size, int) else size
+
+    @staticmethod
+    def _pixmapCost(pixmap: QtGui.QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+#: The icon cache shared by all ribbons.
+iconCache = RibbonIconCache()
+
+
+def DataIcon(filename, size: typing.Union[int, QtCore.QSize] = None) -> QtGui.QIcon:
+    """Return the cached icon of a data file.
+
+    :param filename: The filename of the data file.
+    :param size: The size the icon is shown with.
+    :return: The icon.
+    """
+    return iconCache.icon(DataFile(filename), size)
+
+
+@contextlib.contextmanager
+def batchUpdates(widget, flush: typing.Callable[[], None] = None):
+    """Suspend the updates of a widget until the end of the outermost batch of the widget.
+
+    The widget keeps the exit stack of its open batch in its `_batchStack` attribute, None if there is none.
+    Batches of child widgets entered on the stack end together with the batch of the widget.
+
+    :param widget: The widget.
+    :param flush: Called at the end of the outermost batch to apply the queued changes of the widget.
+    :return: The exit stack of the batch.
+    """
+    if widget._batchStack is not None:
+        yield widget._batchStack
+        return
+    updatesEnabled = widget.updatesEnabled()
+    widget.setUpdatesEnabled(False)
+    try:
+        with contextlib.ExitStack() as stack:
+            widget._batchStack = stack
+            try:
+                yield stack
+            finally:
+                widget._batchStack = None
+                # the children apply their changes first, so the widget is laid out only once
+                stack.close()
+                if flush is not None:
+                    flush()
+    finally:
+        widget.setUpdatesEnabled(updatesEnabled)